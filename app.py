@@ -1,7 +1,12 @@
+import hashlib
+import io
+import json
+import time
+import zipfile
+
 import streamlit as st
 import requests
-
-from file_utils import read_pdf, read_docx, save_pdf, save_docx
+from requests.adapters import HTTPAdapter
 
 API = "http://127.0.0.1:8000"
 
@@ -21,6 +26,65 @@ if "job_desc_prefill" not in st.session_state:
 if "job_search_running" not in st.session_state:
     st.session_state.job_search_running = False
 
+# Client-side cache: key -> (expires_at, value)
+if "client_cache" not in st.session_state:
+    st.session_state.client_cache = {}
+
+HISTORY_TTL = 60
+JOB_SEARCH_TTL = 600
+MODELS_TTL = 30
+
+# Backend calls made by this rerun, shown in the sidebar.
+st.session_state.calls_box = st.sidebar.empty()
+st.session_state.calls_this_run = 0
+st.session_state.setdefault("calls_total", 0)
+
+
+def show_call_count():
+    st.session_state.calls_box.caption(
+        f"Backend calls: {st.session_state.calls_this_run} this interaction, "
+        f"{st.session_state.calls_total} this session"
+    )
+
+
+def count_call(resp, *args, **kwargs):
+    # Looked up through session state: the session outlives this rerun's globals.
+    st.session_state.calls_this_run += 1
+    st.session_state.calls_total += 1
+    show_call_count()
+
+
+show_call_count()
+
+
+def api() -> requests.Session:
+    """One keep-alive session per browser session."""
+    if "http" not in st.session_state:
+        http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        http.mount("http://", adapter)
+        http.mount("https://", adapter)
+        http.hooks["response"].append(count_call)
+        st.session_state.http = http
+    return st.session_state.http
+
+
+def cached(key, ttl, fetch):
+    """Return fetch() from the session cache; None results are not cached."""
+    entry = st.session_state.client_cache.get(key)
+    if entry and (entry[0] is None or entry[0] > time.time()):
+        return entry[1]
+    value = fetch()
+    if value is not None:
+        expires = time.time() + ttl if ttl else None
+        st.session_state.client_cache[key] = (expires, value)
+    return value
+
+
+def invalidate(prefix):
+    for key in [k for k in st.session_state.client_cache if k[0] == prefix]:
+        del st.session_state.client_cache[key]
+
 
 def safe_json(resp: requests.Response):
     """Return JSON if possible else return None (prevents JSONDecodeError)."""
@@ -33,6 +97,55 @@ def safe_json(resp: requests.Response):
     return None
 
 
+ARTIFACT_LABELS = {
+    "ats_resume": "📌 ATS Resume",
+    "cover_letter": "✉️ Cover Letter",
+    "missing_skills": "🧠 Missing Skills",
+    "linkedin_summary": "🔗 LinkedIn Summary",
+}
+
+
+def stream_generate(payload: dict, headers: dict) -> dict:
+    """Render /generate/stream tokens as they arrive; return the final payload."""
+    boxes = {name: st.empty() for name in ARTIFACT_LABELS}
+    texts = {name: "" for name in ARTIFACT_LABELS}
+    final = None
+
+    with api().post(f"{API}/generate/stream", headers=headers, json=payload,
+                    stream=True, timeout=300) as res:
+        if res.status_code != 200:
+            data = safe_json(res)
+            raise RuntimeError(data["detail"] if data and "detail" in data else res.text)
+
+        event = None
+        for line in res.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:"):])
+                if event == "token":
+                    name = data["artifact"]
+                    texts[name] += data["text"]
+                    boxes[name].markdown(f"**{ARTIFACT_LABELS[name]}**\n\n{texts[name]}")
+                elif event == "artifact_error":
+                    boxes[data["artifact"]].warning(
+                        f"{data['artifact']} could not be generated: {data['error']}"
+                    )
+                elif event == "warning":
+                    st.info(data["detail"])
+                elif event == "error":
+                    raise RuntimeError(data["detail"])
+                elif event == "done":
+                    final = data
+
+    for box in boxes.values():
+        box.empty()
+
+    if final is None:
+        raise RuntimeError("Stream ended before generation finished")
+    return final
+
+
 # -------------------- AUTH UI --------------------
 st.sidebar.header("🔐 Login / Register")
 mode = st.sidebar.radio("Choose", ["Login", "Register"], horizontal=True)
@@ -52,7 +165,7 @@ if mode == "Register":
                 st.sidebar.error("Password too long. Max 72 bytes. Use shorter password.")
                 st.stop()
 
-            r = requests.post(f"{API}/register", json={
+            r = api().post(f"{API}/register", json={
                 "username": username,
                 "email": email,
                 "password": password
@@ -76,7 +189,7 @@ if mode == "Login":
         if not username or not password:
             st.sidebar.warning("Enter username & password.")
         else:
-            r = requests.post(f"{API}/login", json={
+            r = api().post(f"{API}/login", json={
                 "username": username,
                 "password": password
             })
@@ -96,6 +209,8 @@ if mode == "Login":
 if st.session_state.token:
     if st.sidebar.button("Logout", use_container_width=True):
         st.session_state.token = None
+        st.session_state.client_cache = {}
+        st.session_state.pop("generated", None)
         st.rerun()
 
 # Must login to proceed
@@ -108,12 +223,17 @@ headers = {"Authorization": f"Bearer {st.session_state.token}"}
 # -------------------- HISTORY UI --------------------
 st.sidebar.header("📌 History")
 
-hist = []
-try:
-    hist_resp = requests.get(f"{API}/history", headers=headers, timeout=60)
+def fetch_history():
+    hist_resp = api().get(f"{API}/history", headers=headers, timeout=60)
     hist_data = safe_json(hist_resp)
     if hist_resp.status_code == 200 and hist_data:
-        hist = hist_data.get("history", [])
+        return hist_data.get("history", [])
+    return None
+
+
+hist = []
+try:
+    hist = cached(("history", st.session_state.token), HISTORY_TTL, fetch_history) or []
 except Exception as e:
     st.sidebar.error(f"History fetch error: {e}")
 
@@ -126,12 +246,18 @@ if hist:
 
     if selected != "None":
         hist_id = int(selected.split("|")[0].strip())
-        item_resp = requests.get(f"{API}/history/{hist_id}", headers=headers, timeout=60)
-        item_data = safe_json(item_resp)
 
-        if item_resp.status_code == 200 and item_data:
-            item = item_data["item"]
+        def fetch_item():
+            item_resp = api().get(f"{API}/history/{hist_id}", headers=headers, timeout=60)
+            item_data = safe_json(item_resp)
+            if item_resp.status_code == 200 and item_data:
+                return item_data["item"]
+            st.error(f"Could not load history item: {item_resp.text}")
+            return None
 
+        # Saved outputs never change, so they are cached for the whole session.
+        item = cached(("history_item", hist_id), None, fetch_item)
+        if item:
             st.subheader("✅ Loaded Saved Output")
             st.write(f"**Job Title:** {item.get('job_title','')}")
             st.write(
@@ -146,8 +272,6 @@ if hist:
             st.text_area("LinkedIn Summary", item["linkedin_summary"], height=140)
 
             st.stop()
-        else:
-            st.error(f"Could not load history item: {item_resp.text}")
 else:
     st.sidebar.info("No history saved yet.")
 
@@ -158,6 +282,7 @@ st.subheader("🔍 Job Scraper Agent (JSearch / RapidAPI)")
 
 kw = st.text_input("Keyword", "Python Developer")
 loc = st.text_input("Location", "India")
+local_only = st.checkbox("Search saved postings only (no RapidAPI call)", value=False)
 
 if st.button("Search Jobs", use_container_width=True):
     if st.session_state.job_search_running:
@@ -166,55 +291,114 @@ if st.button("Search Jobs", use_container_width=True):
 
     st.session_state.job_search_running = True
 
-    try:
-        jr = requests.post(
-            f"{API}/jobs/search",
-            headers=headers,
-            json={"keyword": kw, "location": loc, "page": 1},
-            timeout=120
-        )
+    def fetch_jobs():
+        if local_only:
+            jr = api().post(
+                f"{API}/jobs/local-search",
+                headers=headers,
+                json={"keyword": kw, "location": loc, "limit": 10},
+                timeout=30
+            )
+        else:
+            jr = api().post(
+                f"{API}/jobs/search",
+                headers=headers,
+                json={"keyword": kw, "location": loc, "page": 1},
+                timeout=120
+            )
         jdata = safe_json(jr)
 
         if jr.status_code != 200 or not jdata:
             st.error(jr.text)
-        else:
-            jobs = jdata.get("jobs", [])
+            return None
+        return jdata.get("jobs", [])
+
+    try:
+        jobs = cached(("jobs", kw, loc, local_only), JOB_SEARCH_TTL, fetch_jobs)
+        if jobs is not None:
+            st.session_state.job_results = jobs
             if not jobs:
                 st.info("No jobs found.")
-            else:
-                st.success(f"Found {len(jobs)} jobs ✅")
-                for idx, j in enumerate(jobs[:10], start=1):
-                    with st.expander(f"{idx}. {j.get('title')} — {j.get('company')}"):
-                        st.write(f"📍 {j.get('location')}")
-                        st.write(f"🌐 Source: {j.get('publisher')}")
-                        st.write("### Description (snippet)")
-                        st.write(j.get("snippet", ""))
-
-                        if j.get("apply_link"):
-                            st.link_button("Apply Link", j["apply_link"])
-
-                        if st.button(f"Use this JD #{idx}", key=f"usejd_{idx}"):
-                            st.session_state.job_desc_prefill = j.get("snippet", "")
-                            st.success("Job Description loaded ✅ Scroll down to generator")
     finally:
         st.session_state.job_search_running = False
 
+# Results live in session state so "Use this JD" still works on the rerun it triggers.
+jobs = st.session_state.get("job_results", [])
+if jobs:
+    st.success(f"Found {len(jobs)} jobs ✅")
+    for idx, j in enumerate(jobs[:10], start=1):
+        with st.expander(f"{idx}. {j.get('title')} — {j.get('company')}"):
+            st.write(f"📍 {j.get('location')}")
+            st.write(f"🌐 Source: {j.get('publisher')}")
+            st.write("### Description (snippet)")
+            st.write(j.get("snippet", ""))
+
+            if j.get("apply_link"):
+                st.link_button("Apply Link", j["apply_link"])
+
+            if st.button(f"Use this JD #{idx}", key=f"usejd_{idx}"):
+                description = j.get("description")
+                if not description and j.get("job_id"):
+                    dr = api().get(f"{API}/jobs/{j['job_id']}", headers=headers, timeout=30)
+                    ddata = safe_json(dr)
+                    if dr.status_code == 200 and ddata:
+                        description = ddata["job"].get("description")
+                st.session_state.job_desc_prefill = description or j.get("snippet", "")
+                st.success("Job Description loaded ✅ Scroll down to generator")
+
 st.divider()
 
 # -------------------- MAIN GENERATOR UI --------------------
 st.subheader("🧠 Resume Generator")
 
 model = st.selectbox("Choose Model", ["llama3", "mistral", "gemma"])
+
+
+def fetch_models():
+    r = api().get(f"{API}/models", headers=headers, timeout=10)
+    data = safe_json(r)
+    if r.status_code == 200 and data:
+        return {m["model"]: m for m in data["models"]}
+    return None
+
+
+try:
+    model_info = (cached(("models",), MODELS_TTL, fetch_models) or {}).get(model)
+except Exception:
+    model_info = None
+if model_info is not None and not model_info["resident_on"]:
+    st.caption(f"⏳ {model} is not loaded yet; the first generation will include its load time.")
+    if st.button(f"Load {model} now"):
+        api().post(f"{API}/models/{model}/preload", headers=headers, timeout=10)
+        invalidate("models")
 job_title = st.text_input("Job Title (optional)", "")
+use_cache = st.checkbox("Reuse cached outputs for identical inputs", value=True)
+single_pass = st.checkbox("Single-pass generation (one model call for all outputs)", value=False)
+llm_missing_skills = st.checkbox("Also ask the model for keyword and project suggestions", value=False)
+semantic = st.checkbox("Add a semantic (embedding) match score", value=False)
 
 uploaded = st.file_uploader("Upload Resume (PDF/DOCX)", type=["pdf", "docx"])
 
 resume_text = ""
 if uploaded:
-    if uploaded.name.lower().endswith(".pdf"):
-        resume_text = read_pdf(uploaded)
-    elif uploaded.name.lower().endswith(".docx"):
-        resume_text = read_docx(uploaded)
+    content = uploaded.getvalue()
+
+    def parse_upload():
+        pr = api().post(
+            f"{API}/parse",
+            headers={**headers, "Content-Type": "application/octet-stream"},
+            params={"filename": uploaded.name},
+            data=content,
+            timeout=120
+        )
+        pdata = safe_json(pr)
+        if pr.status_code == 200 and pdata:
+            return pdata["text"]
+        st.error(pdata["detail"] if pdata and "detail" in pdata else f"Could not parse file: {pr.text}")
+        return None
+
+    digest = hashlib.sha256(content).hexdigest()
+    resume_text = cached(("parse", digest), None, parse_upload) or ""
 
 col1, col2 = st.columns(2)
 
@@ -230,47 +414,78 @@ if st.button("🚀 Generate All Outputs", use_container_width=True):
         st.error("Please provide Resume and Job Description.")
         st.stop()
 
-    with st.spinner("Generating..."):
-        try:
-            res = requests.post(
-                f"{API}/generate",
-                headers=headers,
-                json={"resume": resume, "job": job, "model": model, "job_title": job_title},
-                timeout=300
-            )
-        except Exception as e:
-            st.error(f"Backend connection error: {e}")
-            st.stop()
-
-    data = safe_json(res)
-    if res.status_code != 200 or not data:
-        st.error("Backend returned an invalid response.")
-        st.code(res.text)
+    try:
+        data = stream_generate(
+            {"resume": resume, "job": job, "model": model, "job_title": job_title,
+             "use_cache": use_cache, "mode": "single_pass" if single_pass else "pipeline",
+             "llm_missing_skills": llm_missing_skills, "semantic": semantic},
+            headers
+        )
+    except Exception as e:
+        st.error(f"Generation failed: {e}")
         st.stop()
 
-    st.subheader(f"✅ Job Match Score: {data['job_match_score']}%")
-
-    ats_resume = st.text_area("📌 ATS Resume", data["ats_resume"], height=300)
-    cover_letter = st.text_area("✉️ Cover Letter", data["cover_letter"], height=220)
-    missing_skills = st.text_area("🧠 Missing Skills", data["missing_skills"], height=180)
-    linkedin_summary = st.text_area("🔗 LinkedIn Summary", data["linkedin_summary"], height=160)
+    rr = api().post(
+        f"{API}/render/bulk",
+        headers=headers,
+        json={
+            "artifacts": {"ATS_Resume": data["ats_resume"], "CoverLetter": data["cover_letter"]},
+            "formats": ["pdf", "docx"],
+            "filename": "Application"
+        },
+        timeout=120
+    )
+    files = {}
+    if rr.status_code == 200:
+        with zipfile.ZipFile(io.BytesIO(rr.content)) as zf:
+            files = {name: zf.read(name) for name in zf.namelist()}
+        files["Application.zip"] = rr.content
+    else:
+        st.error(f"Could not render documents: {rr.text}")
+
+    # Kept across reruns so downloads don't re-render or lose the outputs.
+    st.session_state.generated = {"data": data, "files": files}
+    invalidate("history")
+
+generated = st.session_state.get("generated")
+if generated:
+    data = generated["data"]
+    files = generated["files"]
 
-    st.subheader("⬇️ Download Files")
-
-    resume_pdf_path = save_pdf(ats_resume, "ATS_Resume.pdf")
-    resume_docx_path = save_docx(ats_resume, "ATS_Resume.docx")
-
-    cover_pdf_path = save_pdf(cover_letter, "CoverLetter.pdf")
-    cover_docx_path = save_docx(cover_letter, "CoverLetter.docx")
-
-    with open(resume_pdf_path, "rb") as f:
-        st.download_button("Download ATS Resume (PDF)", f, file_name="ATS_Resume.pdf")
-
-    with open(resume_docx_path, "rb") as f:
-        st.download_button("Download ATS Resume (DOCX)", f, file_name="ATS_Resume.docx")
-
-    with open(cover_pdf_path, "rb") as f:
-        st.download_button("Download Cover Letter (PDF)", f, file_name="CoverLetter.pdf")
+    st.subheader(f"✅ Job Match Score: {data['job_match_score']}%")
+    if data.get("semantic_score") is not None:
+        st.caption(f"Semantic match: {data['semantic_score']}%")
+
+    if data.get("fallback"):
+        st.caption("Single-pass reply was not valid JSON; generated with the multi-call pipeline instead.")
+
+    compaction = data.get("compaction")
+    if compaction and compaction["tokens_removed"]:
+        st.caption(
+            f"Trimmed ~{compaction['tokens_removed']} prompt tokens "
+            f"({compaction['boilerplate_lines']} boilerplate, {compaction['duplicate_lines']} duplicate lines"
+            f"{', truncated to fit the model' if compaction['truncated'] else ''})."
+        )
 
-    with open(cover_docx_path, "rb") as f:
-        st.download_button("Download Cover Letter (DOCX)", f, file_name="CoverLetter.docx")
+    for stage, err in (data.get("errors") or {}).items():
+        st.warning(f"{stage} could not be generated: {err}")
+
+    st.text_area("📌 ATS Resume", data["ats_resume"], height=300)
+    st.text_area("✉️ Cover Letter", data["cover_letter"], height=220)
+    skills = data.get("skills")
+    if skills:
+        st.markdown(
+            f"**Skill coverage:** {skills['coverage'] if skills['coverage'] is not None else '-'}%  \n"
+            f"**Missing:** {', '.join(skills['missing']) or 'none'}  \n"
+            f"**Matched:** {', '.join(skills['matched']) or 'none'}"
+        )
+    st.text_area("🧠 Missing Skills", data["missing_skills"], height=180)
+    st.text_area("🔗 LinkedIn Summary", data["linkedin_summary"], height=160)
+
+    if files:
+        st.subheader("⬇️ Download Files")
+        st.download_button("Download ATS Resume (PDF)", files["ATS_Resume.pdf"], file_name="ATS_Resume.pdf")
+        st.download_button("Download ATS Resume (DOCX)", files["ATS_Resume.docx"], file_name="ATS_Resume.docx")
+        st.download_button("Download Cover Letter (PDF)", files["CoverLetter.pdf"], file_name="CoverLetter.pdf")
+        st.download_button("Download Cover Letter (DOCX)", files["CoverLetter.docx"], file_name="CoverLetter.docx")
+        st.download_button("Download All (ZIP)", files["Application.zip"], file_name="Application.zip")
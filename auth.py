@@ -1,12 +1,58 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from jose import jwt
 
+from metrics import Counter, Histogram
+
 SECRET_KEY = "CHANGE_THIS_TO_A_RANDOM_SECRET_123456"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+
+# Argon2 cost for new hashes (passlib's defaults); existing hashes keep their own.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "102400"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "8"))
+
+# Hashing runs on its own small pool so login bursts can't starve the API.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "8"))
+HASH_RETRY_AFTER = int(os.getenv("HASH_RETRY_AFTER", "2"))
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+
+HASH_SECONDS = Histogram(
+    "password_hash_seconds", "Time spent hashing or verifying a password",
+    labels=("op",), buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+)
+HASH_WAIT_SECONDS = Histogram(
+    "password_hash_queue_seconds", "Time a password job waited for a worker",
+    labels=("op",), buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Password jobs rejected because the queue was full",
+    labels=("op",)
+)
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(HASH_WORKERS + HASH_QUEUE_LIMIT)
+
+
+class PasswordPoolBusy(Exception):
+    def __init__(self, retry_after: int = HASH_RETRY_AFTER):
+        super().__init__("Too many login/register requests, please retry shortly")
+        self.retry_after = retry_after
 
 
 def hash_password(password: str) -> str:
@@ -21,6 +67,26 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
+def submit_password_job(fn, *args):
+    """Run hash_password/verify_password on the hashing pool; returns a Future."""
+    if not _hash_slots.acquire(blocking=False):
+        HASH_REJECTED.inc(op=fn.__name__)
+        raise PasswordPoolBusy()
+
+    queued = time.perf_counter()
+
+    def run():
+        started = time.perf_counter()
+        HASH_WAIT_SECONDS.observe(started - queued, op=fn.__name__)
+        try:
+            return fn(*args)
+        finally:
+            HASH_SECONDS.observe(time.perf_counter() - started, op=fn.__name__)
+
+    future = _hash_executor.submit(run)
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future
+
 def create_access_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_MINUTES) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=expires_minutes)
@@ -29,3 +95,39 @@ def create_access_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_M
 
 def decode_token(token: str) -> dict:
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+class TokenCache:
+    """LRU of validated tokens -> user rows, each entry dropped at the token's exp."""
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            username, user, exp = entry
+            if exp <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return user
+
+    def put(self, token: str, username: str, user: dict, exp: float):
+        with self._lock:
+            self._entries[token] = (username, user, exp)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, username: str):
+        with self._lock:
+            for token in [t for t, e in self._entries.items() if e[0] == username]:
+                del self._entries[token]
+
+
+token_cache = TokenCache()
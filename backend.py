@@ -1,31 +1,110 @@
-from fastapi import FastAPI, HTTPException, Header
-from pydantic import BaseModel
-import requests
+import asyncio
+import json
+import queue
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from typing import Annotated, Literal
+
+from pydantic import AfterValidator, BaseModel
 
 from prompts import (
     RESUME_PROMPT,
     COVER_LETTER_PROMPT,
     MISSING_SKILLS_PROMPT,
-    LINKEDIN_SUMMARY_PROMPT
+    LINKEDIN_SUMMARY_PROMPT,
+    SINGLE_PASS_PROMPT
 )
-from scorer import job_match_score
+from scorer import job_match_score, batch_job_match_scores, idf_model, init_idf_model
+from pipeline import Stage, run_stages
+from compaction import compact_inputs, ollama_options, RESPONSE_RESERVE_TOKENS, SINGLE_PASS_RESERVE_TOKENS
+from skills import compare_skills, extract_skills, format_missing_skills
+from semantic import batch_semantic_scores, embedding_store, semantic_score
+from llm_cache import llm_cache
+from ollama_client import ollama, observe_generation, OllamaBusy, OllamaError
+from model_residency import residency
+from model_config import check_model
+from job_queue import GenerationQueue
+from bulk import BulkRunner, batch_status, create_batch, ndjson, parse_jobs
 from db import (
     init_db, create_user, get_user_by_username,
     save_history, get_user_history, get_history_item,
-    get_conn
+    get_generation_job, get_corpus_texts, search_jobs, get_job, get_bulk_batch,
+    on_user_change, get_conn
+)
+from auth import (
+    hash_password, verify_password, create_access_token, decode_token, token_cache,
+    submit_password_job, PasswordPoolBusy
 )
-from auth import hash_password, verify_password, create_access_token, decode_token
+from metrics import (
+    Counter, Histogram, render_prometheus, stage_timer, start_request_timings, server_timing_header
+)
+from resume_parser import parse_resume, init_parse_pool, ParseError, PARSE_MAX_BYTES
+from renderer import render_cache, render_zip, MEDIA_TYPES
 
 # ✅ Job Agent
 from job_agent import fetch_jobs
+from job_cache import job_cache
+
+
+def init_storage():
+    """Schema and IDF model; all that running generations in-process needs (bulk CLI)."""
+    init_db()
+    init_idf_model(get_corpus_texts)
+
+
+def start_workers():
+    """Background work owned by the API server, not by scripts importing this module."""
+    init_parse_pool()
+    residency.start()
+    generation_queue.start()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    init_storage()
+    start_workers()
+    yield
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
 
-app = FastAPI()
-init_db()
+app = FastAPI(lifespan=lifespan)
+on_user_change(token_cache.invalidate_user)
+
+SINGLE_PASS_FALLBACKS = Counter(
+    "single_pass_fallback_total", "Single-pass replies that failed validation", labels=("model",),
+)
+HTTP_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to produce a response (excludes streamed bodies)",
+    labels=("method", "route", "status"),
+)
+
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    timings = start_request_timings()
+    t0 = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - t0
+
+    route = request.scope.get("route")
+    HTTP_SECONDS.observe(
+        elapsed, method=request.method,
+        route=route.path if route else "unmatched", status=response.status_code,
+    )
+    # Streamed responses only report work done before the first byte.
+    response.headers["Server-Timing"] = server_timing_header(timings + [("total", elapsed)])
+    return response
 
 
 # -------------------- MODELS --------------------
+# Only configured models: each name gets its own Ollama slot and metrics labels.
+ModelName = Annotated[str, AfterValidator(check_model)]
+
+
 class RegisterReq(BaseModel):
     username: str
     email: str
@@ -40,8 +119,74 @@ class LoginReq(BaseModel):
 class GenReq(BaseModel):
     resume: str
     job: str
-    model: str = "llama3"
+    model: ModelName = "llama3"
     job_title: str = ""
+    use_cache: bool = True
+    # Strip JD boilerplate and fit inputs into the model's context budget.
+    compact: bool = True
+    # "single_pass" asks for all four artifacts in one JSON reply and falls
+    # back to the per-artifact pipeline if the reply is unusable.
+    mode: Literal["pipeline", "single_pass"] = "pipeline"
+    # Missing skills come from the local skill matcher; this adds the LLM's
+    # free-text suggestions (keywords, projects) on top.
+    llm_missing_skills: bool = False
+    # Also score the result with embeddings from EMBED_MODEL.
+    semantic: bool = False
+
+
+class BulkReq(BaseModel):
+    resume: str
+    # Contents of a CSV (header row with a description column) or JSONL file.
+    jobs_file: str
+    format: Literal["csv", "jsonl"] = "jsonl"
+    model: ModelName = "llama3"
+    use_cache: bool = True
+    compact: bool = True
+    mode: Literal["pipeline", "single_pass"] = "pipeline"
+    llm_missing_skills: bool = False
+    semantic: bool = False
+
+
+class SkillsCompareReq(BaseModel):
+    resume: str
+    job: str
+
+
+class SkillsExtractReq(BaseModel):
+    text: str
+
+
+class LocalJobSearchReq(BaseModel):
+    keyword: str = ""
+    location: str = ""
+    limit: int = 20
+
+
+class RenderReq(BaseModel):
+    text: str
+    format: str = "pdf"
+    template: str = "default"
+    filename: str = "document"
+
+
+class RenderBulkReq(BaseModel):
+    artifacts: dict[str, str]
+    formats: list[str] = ["pdf", "docx"]
+    template: str = "default"
+    filename: str = "outputs"
+
+
+class ScoreJob(BaseModel):
+    description: str
+    job_id: str | None = None
+    title: str | None = None
+
+
+class ScoreBatchReq(BaseModel):
+    resume: str
+    jobs: list[ScoreJob]
+    semantic: bool = False
+    rank_by: Literal["lexical", "semantic"] = "lexical"
 
 
 class JobSearchReq(BaseModel):
@@ -51,15 +196,77 @@ class JobSearchReq(BaseModel):
 
 
 # -------------------- HELPERS --------------------
-def ollama_generate(prompt: str, model: str = "llama3") -> str:
-    payload = {"model": model, "prompt": prompt, "stream": False}
-    r = requests.post(OLLAMA_URL, json=payload, timeout=300)
+@contextmanager
+def ollama_errors():
+    try:
+        yield
+    except OllamaBusy as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
+    except OllamaError as e:
+        raise HTTPException(status_code=500, detail=f"Ollama error: {e}")
 
-    if r.status_code != 200:
-        raise HTTPException(status_code=500, detail=f"Ollama error: {r.text}")
 
-    out = r.json().get("response", "")
-    return out.strip()
+def try_semantic(fn, *args):
+    """Semantic scores are optional: returns (result, error) instead of failing the request."""
+    try:
+        return fn(*args), None
+    except (OllamaBusy, OllamaError) as e:
+        return None, f"Embedding error: {e}"
+
+
+def ollama_generate(prompt: str, model: str = "llama3", use_cache: bool = True,
+                    stage: str = "generate", fmt: str | None = None, valid=None) -> str:
+    """fmt is Ollama's output format (e.g. "json"); replies failing valid(out) are not cached."""
+    options = {"format": fmt} if fmt else None
+    if use_cache:
+        cached = llm_cache.get(model, prompt, options)
+        if cached is not None:
+            return cached
+
+    payload = {
+        "model": model, "prompt": prompt,
+        "keep_alive": residency.keep_alive(model), "options": ollama_options(model),
+    }
+    if fmt:
+        payload["format"] = fmt
+    with ollama_errors(), stage_timer(f"llm.{stage}", model):
+        data = ollama.generate(payload)
+    observe_generation(data, model, stage)
+
+    out = data.get("response", "").strip()
+    if valid is None or valid(out):
+        llm_cache.put(model, prompt, out, options)
+    return out
+
+
+def ollama_stream(prompt: str, model: str = "llama3", use_cache: bool = True,
+                  stage: str = "generate"):
+    """Yield response tokens as Ollama produces them."""
+    if use_cache:
+        cached = llm_cache.get(model, prompt)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    with ollama_errors(), stage_timer(f"llm.{stage}", model):
+        payload = {
+            "model": model, "prompt": prompt,
+            "keep_alive": residency.keep_alive(model), "options": ollama_options(model),
+        }
+        for chunk in ollama.stream(payload):
+            if chunk.get("response"):
+                parts.append(chunk["response"])
+                yield chunk["response"]
+            if chunk.get("done"):
+                observe_generation(chunk, model, stage)
+    llm_cache.put(model, prompt, "".join(parts).strip())
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 def get_current_user(authorization: str | None):
@@ -69,6 +276,10 @@ def get_current_user(authorization: str | None):
         raise HTTPException(status_code=401, detail="Invalid Authorization format")
 
     token = authorization.replace("Bearer ", "").strip()
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
     try:
         payload = decode_token(token)
     except Exception:
@@ -82,12 +293,25 @@ def get_current_user(authorization: str | None):
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
+    user = dict(user)
+    if payload.get("exp"):
+        token_cache.put(token, username, user, payload["exp"])
     return user
 
 
 # -------------------- AUTH ROUTES --------------------
-@app.post("/register")
-def register(req: RegisterReq):
+async def run_password_job(fn, *args):
+    # Awaiting keeps the request off the shared threadpool while argon2 runs.
+    try:
+        future = submit_password_job(fn, *args)
+    except PasswordPoolBusy as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
+    return await asyncio.wrap_future(future)
+
+
+def check_new_user(req: RegisterReq):
     # Username unique check
     existing = get_user_by_username(req.username)
     if existing:
@@ -107,10 +331,17 @@ def register(req: RegisterReq):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB error: {str(e)}")
 
+
+@app.post("/register")
+async def register(req: RegisterReq):
+    await run_in_threadpool(check_new_user, req)
+
     try:
-        pw_hash = hash_password(req.password)
-        create_user(req.username, req.email, pw_hash)
+        pw_hash = await run_password_job(hash_password, req.password)
+        await run_in_threadpool(create_user, req.username, req.email, pw_hash)
         return {"message": "User registered successfully"}
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -118,54 +349,267 @@ def register(req: RegisterReq):
 
 
 @app.post("/login")
-def login(req: LoginReq):
-    user = get_user_by_username(req.username)
+async def login(req: LoginReq):
+    user = await run_in_threadpool(get_user_by_username, req.username)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
     stored_hash = user["password_hash"]
 
-    if not verify_password(req.password, stored_hash):
+    if not await run_password_job(verify_password, req.password, stored_hash):
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
     token = create_access_token({"sub": user["username"], "user_id": user["id"]})
     return {"access_token": token, "token_type": "bearer"}
 
 
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # -------------------- JOB SCRAPER AGENT --------------------
 @app.post("/jobs/search")
 def jobs_search(req: JobSearchReq, authorization: str | None = Header(default=None)):
     _ = get_current_user(authorization)  # login required
     try:
         jobs = fetch_jobs(req.keyword, req.location, req.page)
+        idf_model.partial_fit([j["description"] for j in jobs])
+        idf_model.maybe_save()
         return {"jobs": jobs}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Job search error: {str(e)}")
 
 
-# -------------------- GENERATE + HISTORY --------------------
-@app.post("/generate")
-def generate(req: GenReq, authorization: str | None = Header(default=None)):
-    user = get_current_user(authorization)
+@app.get("/jobs/cache/stats")
+def jobs_cache_stats(authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    return {"job_cache": job_cache.stats()}
 
-    ats_resume = ollama_generate(
-        RESUME_PROMPT.format(resume=req.resume, job=req.job),
-        model=req.model
-    )
-    cover_letter = ollama_generate(
-        COVER_LETTER_PROMPT.format(resume=ats_resume, job=req.job),
-        model=req.model
+
+@app.post("/jobs/local-search")
+def jobs_local_search(req: LocalJobSearchReq, authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    rows = search_jobs(req.keyword, req.location, limit=max(1, min(req.limit, 100)))
+    jobs = []
+    for r in rows:
+        job = dict(r)
+        job["snippet"] = (job["description"] or "")[:700]
+        jobs.append(job)
+    return {"jobs": jobs}
+
+
+@app.get("/jobs/{job_id}")
+def job_detail(job_id: str, authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    row = get_job(job_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Not found")
+    return {"job": dict(row)}
+
+
+# -------------------- RESUME PARSING --------------------
+@app.post("/parse")
+async def parse(request: Request, filename: str, authorization: str | None = Header(default=None)):
+    # Body is the raw file; filename picks the parser (.pdf / .docx).
+    _ = await run_in_threadpool(get_current_user, authorization)
+
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > PARSE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"File too large (max {PARSE_MAX_BYTES} bytes)")
+
+    data = await request.body()
+    try:
+        return await run_in_threadpool(parse_resume, data, filename)
+    except ParseError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+# -------------------- DOCUMENT RENDERING --------------------
+def attachment(filename: str) -> dict:
+    safe = "".join(c for c in filename if c.isalnum() or c in "._-") or "document"
+    return {"Content-Disposition": f'attachment; filename="{safe}"'}
+
+
+@app.post("/render")
+def render(req: RenderReq, authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    try:
+        data = render_cache.render(req.text, req.format, req.template)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(
+        data, media_type=MEDIA_TYPES[req.format],
+        headers=attachment(f"{req.filename}.{req.format}")
     )
-    missing_skills = ollama_generate(
-        MISSING_SKILLS_PROMPT.format(resume=ats_resume, job=req.job),
-        model=req.model
+
+
+@app.post("/render/bulk")
+def render_bulk(req: RenderBulkReq, authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    try:
+        data = render_zip(req.artifacts, req.formats, req.template)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(data, media_type=MEDIA_TYPES["zip"], headers=attachment(f"{req.filename}.zip"))
+
+
+# -------------------- SCORING --------------------
+@app.post("/score/batch")
+def score_batch(req: ScoreBatchReq, authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    descriptions = [j.description for j in req.jobs]
+    scores = batch_job_match_scores(req.resume, descriptions)
+    results = [
+        {"job_id": j.job_id, "title": j.title, "job_match_score": score}
+        for j, score in zip(req.jobs, scores)
+    ]
+
+    semantic_error = None
+    if req.semantic or req.rank_by == "semantic":
+        semantic_scores, semantic_error = try_semantic(batch_semantic_scores, req.resume, descriptions)
+        for r, score in zip(results, semantic_scores or [None] * len(results)):
+            r["semantic_score"] = score
+
+    key = "semantic_score" if req.rank_by == "semantic" and not semantic_error else "job_match_score"
+    ranked = sorted(results, key=lambda r: r[key], reverse=True)
+    response = {"results": ranked, "ranked_by": key}
+    if semantic_error:
+        response["semantic_error"] = semantic_error
+    return response
+
+
+# -------------------- SKILLS --------------------
+@app.post("/skills/compare")
+def skills_compare(req: SkillsCompareReq, authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    return compare_skills(req.resume, req.job)
+
+
+@app.post("/skills/extract")
+def skills_extract(req: SkillsExtractReq, authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    return {"skills": extract_skills(req.text)}
+
+
+# -------------------- GENERATE + HISTORY --------------------
+def prepare_inputs(req: GenReq):
+    """(resume, job, compaction report) to build the prompts from."""
+    if not req.compact:
+        return req.resume, req.job, None
+    # A single-pass reply holds all four artifacts, so it needs more room.
+    if req.mode == "single_pass":
+        template, reserve = SINGLE_PASS_PROMPT, SINGLE_PASS_RESERVE_TOKENS
+    else:
+        template, reserve = RESUME_PROMPT, RESPONSE_RESERVE_TOKENS
+    with stage_timer("compact", req.model):
+        return compact_inputs(req.resume, req.job, req.model, template=template, reserve=reserve)
+
+
+def generation_stages(req: GenReq, llm=None, inputs=None):
+    # llm(artifact, prompt) -> text; defaults to a blocking Ollama call.
+    # inputs is (resume, job) as returned by prepare_inputs; defaults to the raw request.
+    resume, job = inputs or (req.resume, req.job)
+    if llm is None:
+        def llm(artifact, prompt):
+            return ollama_generate(prompt, model=req.model, use_cache=req.use_cache, stage=artifact)
+
+    # Without the rewritten resume there is nothing useful to return or save.
+    stages = [
+        Stage("ats_resume", lambda r: llm(
+            "ats_resume", RESUME_PROMPT.format(resume=resume, job=job)
+        ), critical=True),
+        Stage("cover_letter", lambda r: llm(
+            "cover_letter", COVER_LETTER_PROMPT.format(resume=r["ats_resume"], job=job)
+        ), deps=["ats_resume"]),
+        Stage("linkedin_summary", lambda r: llm(
+            "linkedin_summary", LINKEDIN_SUMMARY_PROMPT.format(resume=r["ats_resume"])
+        ), deps=["ats_resume"]),
+    ]
+    if req.llm_missing_skills:
+        stages.append(Stage("missing_skills", lambda r: llm(
+            "missing_skills", MISSING_SKILLS_PROMPT.format(resume=r["ats_resume"], job=job)
+        ), deps=["ats_resume"]))
+    return stages
+
+
+ARTIFACTS = ("ats_resume", "cover_letter", "missing_skills", "linkedin_summary")
+
+
+def parse_single_pass(text: str):
+    """The four artifacts from a single-pass JSON reply, or None if it is unusable."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    out = {}
+    for name in ARTIFACTS:
+        value = data.get(name)
+        # Models often answer missing_skills with a list despite the prompt.
+        if isinstance(value, list) and all(isinstance(v, str) for v in value):
+            value = "\n".join(f"- {v}" for v in value)
+        if not isinstance(value, str) or not value.strip():
+            return None
+        out[name] = value.strip()
+    return out
+
+
+def single_pass(req: GenReq, resume: str, job: str):
+    raw = ollama_generate(
+        SINGLE_PASS_PROMPT.format(resume=resume, job=job),
+        model=req.model, use_cache=req.use_cache, stage="single_pass",
+        fmt="json", valid=lambda out: parse_single_pass(out) is not None,
     )
-    linkedin_summary = ollama_generate(
-        LINKEDIN_SUMMARY_PROMPT.format(resume=ats_resume),
-        model=req.model
+    return parse_single_pass(raw)
+
+
+def run_generation(req: GenReq, llm=None, on_event=None):
+    """Returns (results, errors, info) where info goes into the response."""
+    resume, job, compaction = prepare_inputs(req)
+    info = {
+        "mode": req.mode, "fallback": False, "compaction": compaction,
+        "model_warning": residency.cold_warning(req.model),
+    }
+
+    if req.mode == "single_pass":
+        results = single_pass(req, resume, job)
+        if results is not None:
+            # The reply always has missing_skills; it is only used when asked for.
+            if not req.llm_missing_skills:
+                results.pop("missing_skills", None)
+            if on_event:
+                for name, text in results.items():
+                    on_event("done", name, text)
+            return results, {}, info
+        SINGLE_PASS_FALLBACKS.inc(model=req.model)
+        info.update(mode="pipeline", fallback=True)
+
+    results, errors = run_stages(
+        generation_stages(req, llm, inputs=(resume, job)), model=req.model, on_event=on_event
     )
+    return results, errors, info
+
 
+def finish_generation(user, req: GenReq, results: dict, errors: dict, info=None) -> dict:
+    ats_resume = results["ats_resume"]
+    cover_letter = results.get("cover_letter", "")
+    linkedin_summary = results.get("linkedin_summary", "")
+    # Skills are matched against the submitted resume, not the rewrite, so
+    # anything the model added does not count as covered.
+    skills = compare_skills(req.resume, req.job)
+    missing_skills = (req.llm_missing_skills and results.get("missing_skills")) or format_missing_skills(skills)
+
+    idf_model.partial_fit([req.job, req.resume])
+    idf_model.maybe_save()
     score = job_match_score(ats_resume, req.job)
+    semantic = None
+    if req.semantic:
+        semantic, error = try_semantic(semantic_score, ats_resume, req.job)
+        if error:
+            errors["semantic_score"] = error
 
     save_history(
         user_id=user["id"],
@@ -185,15 +629,216 @@ def generate(req: GenReq, authorization: str | None = Header(default=None)):
         "cover_letter": cover_letter,
         "missing_skills": missing_skills,
         "linkedin_summary": linkedin_summary,
-        "job_match_score": score
+        "job_match_score": score,
+        "semantic_score": semantic,
+        "skills": skills,
+        **(info or {}),
+        "errors": errors
+    }
+
+
+@app.post("/generate")
+def generate(req: GenReq, authorization: str | None = Header(default=None)):
+    user = get_current_user(authorization)
+    results, errors, info = run_generation(req)
+    return finish_generation(user, req, results, errors, info)
+
+
+def run_generation_job(user_id, request: dict, on_event):
+    req = GenReq(**request)
+    results, errors, info = run_generation(req, on_event=on_event)
+    return finish_generation({"id": user_id}, req, results, errors, info)
+
+
+generation_queue = GenerationQueue(
+    run_generation_job,
+    stages=[s.name for s in generation_stages(GenReq(resume="", job=""))]
+)
+
+
+def run_bulk_job(user_id, request: dict):
+    req = GenReq(**request)
+    results, errors, info = run_generation(req)
+    return finish_generation({"id": user_id}, req, results, errors, info)
+
+
+bulk_runner = BulkRunner(run_bulk_job)
+
+
+def bulk_stream(batch_id):
+    return StreamingResponse(
+        ndjson(bulk_runner.run(batch_id)),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/bulk")
+def bulk_generate(req: BulkReq, authorization: str | None = Header(default=None)):
+    user = get_current_user(authorization)
+    try:
+        jobs = parse_jobs(req.jobs_file, req.format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    batch_id = create_batch(user["id"], req.model_dump(exclude={"jobs_file", "format"}), jobs)
+    return bulk_stream(batch_id)
+
+
+@app.get("/bulk/{batch_id}")
+def bulk_status(batch_id: str, authorization: str | None = Header(default=None)):
+    user = get_current_user(authorization)
+    row = get_bulk_batch(batch_id, user["id"])
+    if not row:
+        raise HTTPException(status_code=404, detail="Not found")
+    return batch_status(row)
+
+
+@app.post("/bulk/{batch_id}/resume")
+def bulk_resume(batch_id: str, authorization: str | None = Header(default=None)):
+    user = get_current_user(authorization)
+    if not get_bulk_batch(batch_id, user["id"]):
+        raise HTTPException(status_code=404, detail="Not found")
+    if bulk_runner.is_running(batch_id):
+        raise HTTPException(status_code=409, detail="Batch is already running")
+    return bulk_stream(batch_id)
+
+
+@app.post("/generate/jobs")
+def submit_generate_job(req: GenReq, authorization: str | None = Header(default=None)):
+    user = get_current_user(authorization)
+    job_id = generation_queue.submit(user["id"], req.model_dump())
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/generate/{job_id}")
+def generate_job_status(job_id: str, authorization: str | None = Header(default=None)):
+    user = get_current_user(authorization)
+    row = get_generation_job(job_id, user["id"])
+    if not row:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    return {
+        "job_id": row["id"],
+        "status": row["status"],
+        "progress": json.loads(row["progress"]),
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"]
+    }
+
+
+@app.post("/generate/stream")
+def generate_stream(req: GenReq, authorization: str | None = Header(default=None)):
+    user = get_current_user(authorization)
+    events = queue.Queue()
+
+    streamed = set()
+
+    def llm(artifact, prompt):
+        parts = []
+        streamed.add(artifact)
+        for token in ollama_stream(prompt, model=req.model, use_cache=req.use_cache, stage=artifact):
+            parts.append(token)
+            events.put(sse_event("token", {"artifact": artifact, "text": token}))
+        return "".join(parts).strip()
+
+    def on_event(kind, artifact, payload):
+        if kind == "done":
+            # Single-pass artifacts arrive whole rather than token by token.
+            if artifact not in streamed:
+                events.put(sse_event("token", {"artifact": artifact, "text": payload}))
+            events.put(sse_event("artifact_done", {"artifact": artifact}))
+        elif kind == "error":
+            events.put(sse_event("artifact_error", {"artifact": artifact, "error": payload}))
+
+    # The pipeline runs on its own thread so the history row is still written
+    # if the client goes away mid-stream.
+    def run():
+        try:
+            warning = residency.cold_warning(req.model)
+            if warning:
+                events.put(sse_event("warning", {"detail": warning}))
+            results, errors, info = run_generation(req, llm, on_event)
+            events.put(sse_event("done", finish_generation(user, req, results, errors, info)))
+        except HTTPException as e:
+            events.put(sse_event("error", {"detail": e.detail, "status": e.status_code}))
+        except Exception as e:
+            events.put(sse_event("error", {"detail": f"Generate error: {str(e)}"}))
+        finally:
+            events.put(None)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    def stream():
+        while True:
+            item = events.get()
+            if item is None:
+                break
+            yield item
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/cache/stats")
+def cache_stats(authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    return {
+        "llm_cache": llm_cache.stats(),
+        "embeddings": embedding_store.stats(),
+        "render_cache": render_cache.stats(),
     }
 
 
+@app.get("/ollama/status")
+def ollama_status(authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    return {"ollama": ollama.stats()}
+
+
+@app.get("/models")
+def models(authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    return residency.status()
+
+
+@app.post("/models/{model}/preload")
+def preload_model(model: str, authorization: str | None = Header(default=None)):
+    _ = get_current_user(authorization)
+    try:
+        check_model(model)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if residency.is_resident(model):
+        return {"model": model, "status": "resident"}
+    threading.Thread(target=residency.preload, args=([model],), daemon=True).start()
+    return {"model": model, "status": "loading"}
+
+
 @app.get("/history")
-def history(authorization: str | None = Header(default=None)):
+def history(
+    limit: int = 30,
+    cursor: int | None = None,
+    job_title: str | None = None,
+    model: str | None = None,
+    min_score: float | None = None,
+    max_score: float | None = None,
+    authorization: str | None = Header(default=None)
+):
     user = get_current_user(authorization)
-    rows = get_user_history(user["id"], limit=30)
-    return {"history": [dict(r) for r in rows]}
+    limit = max(1, min(limit, 100))
+    rows = get_user_history(
+        user["id"], limit=limit + 1, before_id=cursor, job_title=job_title,
+        model=model, min_score=min_score, max_score=max_score
+    )
+    page = [dict(r) for r in rows[:limit]]
+    next_cursor = page[-1]["id"] if len(rows) > limit else None
+    return {"history": page, "next_cursor": next_cursor}
 
 
 @app.get("/history/{history_id}")
@@ -0,0 +1 @@
+"""Benchmarks against stub Ollama/JSearch servers; see benchmarks/run.py."""
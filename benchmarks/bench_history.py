@@ -0,0 +1,79 @@
+"""Measure /history requests per second with and without the connection pool.
+
+"before" opens a fresh rollback-journal connection per query, like the old
+db.get_conn; "after" uses the WAL-mode pool. Each run uses a throwaway copy of
+the schema with seeded history rows, and every other data file (caches, IDF
+model) goes to a temp dir too, so the working tree is never touched.
+
+Run from the repo root:  python benchmarks/bench_history.py [--requests 2000]
+(needs the benchmark extras: pip install -r benchmarks/requirements.txt)
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Set before importing db/backend: they place their files under this dir.
+os.environ.setdefault("RESUME_AI_DATA_DIR", tempfile.mkdtemp(prefix="resume-ai-bench-"))
+
+import db
+
+
+def legacy_get_conn():
+    conn = sqlite3.connect(db.DB_PATH, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def seed(rows):
+    db.init_db()
+    db.create_user("bench", "bench@example.com", "x")
+    user = db.get_user_by_username("bench")
+    for i in range(rows):
+        db.save_history(user["id"], f"Job {i}", "resume", "jd", "ats", "cl", "ms", "li", 50.0, "llama3")
+
+
+def run(label, use_pool, args):
+    tmp = tempfile.mkdtemp()
+    db.DB_PATH = os.path.join(tmp, "bench.db")
+    db.pool = db.ConnectionPool(db.DB_PATH, size=args.threads)
+    db.get_conn = db.pool.acquire if use_pool else legacy_get_conn
+    seed(args.rows)
+
+    # Imported late so backend's storage init runs against the temporary DB.
+    from fastapi.testclient import TestClient
+    import backend
+    from auth import create_access_token
+
+    # Not `with TestClient(...)`: the server's background workers are not needed.
+    backend.init_storage()
+    client = TestClient(backend.app)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench'})}"}
+    assert client.get("/history", headers=headers).status_code == 200
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as ex:
+        codes = list(ex.map(lambda _: client.get("/history", headers=headers).status_code,
+                            range(args.requests)))
+    elapsed = time.perf_counter() - t0
+    assert all(c == 200 for c in codes)
+    print(f"{label:7s}: {args.requests / elapsed:8.1f} req/s  ({args.requests} requests, {args.threads} threads)")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--rows", type=int, default=500)
+    args = ap.parse_args()
+
+    run("before", False, args)
+    run("after", True, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare the corpus IDF scorer with the old per-call TfidfVectorizer fit.
+
+Run from the repo root:  python benchmarks/bench_scorer.py [--pairs 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from benchmarks.data import FILLER, SKILLS
+from scorer import CorpusIdfModel
+import scorer
+
+
+def per_call_fit_score(resume_text, job_text):
+    # The scorer as it was before the corpus model.
+    vectorizer = TfidfVectorizer(stop_words="english")
+    tfidf = vectorizer.fit_transform([resume_text, job_text])
+    score = cosine_similarity(tfidf[0:1], tfidf[1:2])[0][0]
+    return round(score * 100, 2)
+
+
+def fake_doc(rng, n_words):
+    words = rng.sample(SKILLS, 6) + rng.choices(FILLER, k=n_words)
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def timed(fn, pairs):
+    out, t0 = [], time.perf_counter()
+    for r, j in pairs:
+        out.append(fn(r, j))
+    return out, (time.perf_counter() - t0) / len(pairs) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=200)
+    ap.add_argument("--corpus", type=int, default=2000)
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    model = CorpusIdfModel(path=os.devnull)
+    model.partial_fit(fake_doc(rng, 250) for _ in range(args.corpus))
+    scorer.idf_model = model
+
+    pairs = [(fake_doc(rng, 300), fake_doc(rng, 250)) for _ in range(args.pairs)]
+
+    old, old_ms = timed(per_call_fit_score, pairs)
+    new, new_ms = timed(scorer.job_match_score, pairs)
+
+    # Stability: scores should barely move when the corpus grows by 10%.
+    model.partial_fit(fake_doc(rng, 250) for _ in range(args.corpus // 10))
+    grown, _ = timed(scorer.job_match_score, pairs)
+
+    print(f"pairs={args.pairs} corpus_docs={args.corpus}")
+    print(f"per-call fit : {old_ms:7.3f} ms/score  mean={statistics.mean(old):.2f}  sd={statistics.pstdev(old):.2f}")
+    print(f"corpus IDF   : {new_ms:7.3f} ms/score  mean={statistics.mean(new):.2f}  sd={statistics.pstdev(new):.2f}")
+    print(f"speedup      : {old_ms / new_ms:.1f}x")
+    drift = [abs(a - b) for a, b in zip(new, grown)]
+    print(f"drift after +10% corpus: mean={statistics.mean(drift):.3f}  max={max(drift):.3f} points")
+
+
+if __name__ == "__main__":
+    main()
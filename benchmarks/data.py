@@ -0,0 +1,63 @@
+"""Synthetic resumes and job descriptions shared by the benchmarks."""
+import random
+
+SKILLS = [
+    "python", "java", "sql", "postgresql", "docker", "kubernetes", "aws", "react",
+    "fastapi", "django", "pandas", "numpy", "spark", "airflow", "terraform", "linux",
+    "tensorflow", "pytorch", "git", "rest", "graphql", "redis", "kafka", "azure",
+]
+FILLER = [
+    "experience", "team", "build", "design", "develop", "systems", "data", "product",
+    "customers", "scalable", "services", "platform", "ownership", "collaborate",
+    "requirements", "delivery", "quality", "testing", "deploy", "monitoring",
+]
+# Typical pasted-JD padding that prompt compaction should remove.
+BOILERPLATE = """Benefits:
+- Comprehensive health, dental and vision insurance for you and your family
+- Generous paid time off, parental leave and company holidays
+- Learning budget, wellness stipend and home office allowance
+
+Equal Opportunity Employer:
+We are an equal opportunity employer. All qualified applicants will receive consideration
+for employment without regard to race, color, religion, sex, sexual orientation, gender
+identity, national origin, disability or protected veteran status. We provide reasonable
+accommodation to applicants with disabilities throughout the hiring process.
+"""
+KEYWORDS = [
+    "python developer", "data engineer", "backend engineer", "ml engineer",
+    "devops engineer", "data analyst", "full stack developer", "sre",
+]
+
+
+def _sentences(rng, n_sentences, words_per=14):
+    out = []
+    for _ in range(n_sentences):
+        words = rng.sample(SKILLS, 3) + rng.choices(FILLER, k=words_per - 3)
+        rng.shuffle(words)
+        out.append(" ".join(words).capitalize() + ".")
+    return out
+
+
+def fake_resume(rng=None, n_bullets=12) -> str:
+    rng = rng or random.Random(1)
+    lines = [
+        "Jane Doe",
+        "jane@example.com | +91 90000 00000",
+        "SUMMARY",
+        " ".join(_sentences(rng, 2)),
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 10)),
+        "EXPERIENCE",
+    ]
+    lines += [f"- {s}" for s in _sentences(rng, n_bullets)]
+    lines += ["EDUCATION", "B.Tech Computer Science, 2019"]
+    return "\n".join(lines)
+
+
+def fake_job_description(rng=None, n_paragraphs=4, boilerplate=0) -> str:
+    """A JD; boilerplate=N appends the benefits/EEO block N times, as pasted JDs often repeat it."""
+    rng = rng or random.Random(2)
+    paragraphs = [" ".join(_sentences(rng, 4)) for _ in range(n_paragraphs)]
+    paragraphs.append("Requirements: " + ", ".join(rng.sample(SKILLS, 6)) + ".")
+    paragraphs += [BOILERPLATE] * boilerplate
+    return "\n\n".join(paragraphs)
@@ -0,0 +1,216 @@
+"""Concurrent-user load scenarios against a running backend.
+
+Each simulated user registers, logs in, warms up with one generation and
+then issues a weighted mix of requests until the duration is up. By
+default the backend is started with uvicorn against the stub Ollama and
+JSearch servers and a throwaway data directory.
+"""
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks import stub_jsearch, stub_ollama
+from benchmarks.data import KEYWORDS, fake_job_description, fake_resume
+from benchmarks.stats import summarize
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Operation weights per scenario.
+SCENARIOS = {
+    "generate": {"generate": 1},
+    "jobs": {"jobs_search": 1},
+    "history": {"history": 1},
+    "mixed": {"generate": 2, "jobs_search": 3, "history": 5},
+}
+
+
+class BackendServer:
+    """uvicorn serving backend:app in a subprocess with its own data dir."""
+
+    def __init__(self, ollama_url, jsearch_url, port=18600, workers=1, env=None):
+        self.url = f"http://127.0.0.1:{port}"
+        self.data_dir = tempfile.mkdtemp(prefix="resume-ai-bench-")
+        self.log_path = os.path.join(self.data_dir, "backend.log")
+        self.env = {
+            **os.environ,
+            "RESUME_AI_DATA_DIR": self.data_dir,
+            "OLLAMA_URLS": ollama_url,
+            "JSEARCH_URL": jsearch_url,
+            "RAPIDAPI_KEY": "bench",
+            # Registration is setup, not what is being measured.
+            "ARGON2_MEMORY_COST": "8192",
+            "ARGON2_PARALLELISM": "1",
+            **(env or {}),
+        }
+        self.cmd = [
+            sys.executable, "-m", "uvicorn", "backend:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ]
+        self.proc = None
+
+    def __enter__(self):
+        self._log = open(self.log_path, "w")
+        self.proc = subprocess.Popen(self.cmd, cwd=REPO_ROOT, env=self.env,
+                                     stdout=self._log, stderr=subprocess.STDOUT)
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if self.proc.poll() is not None:
+                self._stop()
+                raise RuntimeError(f"backend exited early, see {self.log_path}")
+            try:
+                requests.get(f"{self.url}/metrics", timeout=1)
+                return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self._stop()
+        raise RuntimeError(f"backend did not start within 60s, see {self.log_path}")
+
+    def _stop(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self._log.close()
+
+    def __exit__(self, *exc):
+        self._stop()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+
+class User:
+    def __init__(self, base_url, index, args):
+        self.base_url = base_url
+        self.args = args
+        self.rng = random.Random(args.seed + index)
+        self.session = requests.Session()
+        self.resume = fake_resume(self.rng)
+        self.name = f"bench_{uuid.uuid4().hex[:10]}"
+
+    def _call(self, method, path, **kwargs):
+        r = self.session.request(method, f"{self.base_url}{path}", timeout=self.args.timeout, **kwargs)
+        r.raise_for_status()
+        return r
+
+    def login(self):
+        creds = {"username": self.name, "password": "bench-password"}
+        self._call("POST", "/register", json={**creds, "email": f"{self.name}@example.com"})
+        token = self._call("POST", "/login", json=creds).json()["access_token"]
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def generate(self):
+        self._call("POST", "/generate", json={
+            "resume": self.resume,
+            "job": fake_job_description(self.rng, boilerplate=self.args.jd_boilerplate),
+            "model": self.args.model,
+            "job_title": self.rng.choice(KEYWORDS),
+            "use_cache": self.args.llm_cache,
+            "compact": self.args.compact,
+            "mode": self.args.mode,
+        })
+
+    def jobs_search(self):
+        keyword = self.rng.choice(KEYWORDS[:self.args.distinct_keywords])
+        self._call("POST", "/jobs/search", json={"keyword": keyword, "location": "India"})
+
+    def history(self):
+        self._call("GET", "/history", params={"limit": 30})
+
+
+def run_scenario(base_url, args) -> dict:
+    weights = SCENARIOS[args.scenario]
+    ops, op_weights = list(weights), list(weights.values())
+    latencies = {op: [] for op in ops}
+    errors = {op: 0 for op in ops}
+    lock = threading.Lock()
+
+    users = [User(base_url, i, args) for i in range(args.users)]
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        list(pool.map(lambda u: u.login(), users))
+        if args.warmup:
+            list(pool.map(lambda u: u.generate(), users))
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+
+    def loop(user):
+        while time.perf_counter() < deadline:
+            op = user.rng.choices(ops, op_weights)[0]
+            t0 = time.perf_counter()
+            try:
+                getattr(user, op)()
+                ok = True
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - t0
+            with lock:
+                if ok:
+                    latencies[op].append(elapsed)
+                else:
+                    errors[op] += 1
+
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        list(pool.map(loop, users))
+    wall = time.perf_counter() - started
+
+    result = {op: summarize(latencies[op], wall, errors[op]) for op in ops}
+    result["all"] = summarize([v for op in ops for v in latencies[op]], wall, sum(errors.values()))
+    return result
+
+
+def run_load(args) -> dict:
+    if args.backend_url:
+        return run_scenario(args.backend_url, args)
+
+    ollama_server, ollama_url, _ = stub_ollama.start(config=stub_ollama.config_from_args(args))
+    jsearch_server, jsearch_url = stub_jsearch.start(config=stub_jsearch.config_from_args(args))
+    try:
+        with BackendServer(ollama_url, jsearch_url, port=args.port, workers=args.workers) as backend:
+            return run_scenario(backend.url, args)
+    finally:
+        ollama_server.shutdown()
+        jsearch_server.shutdown()
+
+
+def run_compaction(args) -> dict:
+    """The generate scenario with prompt compaction off, then on, on boilerplate-heavy JDs."""
+    args.scenario = "generate"
+    results = {}
+    for compact in (False, True):
+        args.compact = compact
+        results["compact_on" if compact else "compact_off"] = run_load(args)["generate"]
+    off, on = results["compact_off"]["p50_ms"], results["compact_on"]["p50_ms"]
+    results["p50_speedup"] = round(off / on, 3) if off and on else None
+    return results
+
+
+def add_arguments(ap):
+    ap.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    ap.add_argument("--users", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=30.0, help="seconds of measured load")
+    ap.add_argument("--model", default="llama3")
+    ap.add_argument("--llm-cache", action="store_true", help="let /generate hit the LLM cache")
+    ap.add_argument("--mode", choices=["pipeline", "single_pass"], default="pipeline", help="/generate mode")
+    ap.add_argument("--no-compact", dest="compact", action="store_false", help="send compact=false with /generate")
+    ap.add_argument("--jd-boilerplate", type=int, default=0, help="benefits/EEO blocks appended to each JD")
+    ap.add_argument("--distinct-keywords", type=int, default=4, help="job searches rotate over this many keywords")
+    ap.add_argument("--no-warmup", dest="warmup", action="store_false")
+    ap.add_argument("--timeout", type=float, default=300.0)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--backend-url", help="benchmark an already running backend instead of starting one")
+    ap.add_argument("--port", type=int, default=18600)
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn workers for the started backend")
+    stub_ollama.add_arguments(ap)
+    stub_jsearch.add_arguments(ap)
@@ -0,0 +1,67 @@
+"""In-process micro-benchmarks for scoring and document I/O."""
+import os
+import random
+import tempfile
+import time
+from io import BytesIO
+
+from benchmarks.data import fake_job_description, fake_resume
+from benchmarks.stats import summarize
+
+
+def _time(fn, inputs):
+    latencies = []
+    for item in inputs:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies)
+
+
+def run_micro(args) -> dict:
+    # Imported here so run.py can point RESUME_AI_DATA_DIR at a temp dir first.
+    import file_utils
+    import scorer
+    import skills
+    from scorer import CorpusIdfModel
+
+    rng = random.Random(args.seed)
+    n = args.iterations
+    results = {}
+
+    model = CorpusIdfModel(path=os.devnull)
+    model.partial_fit(fake_job_description(rng) for _ in range(args.corpus))
+    scorer.idf_model = model
+    pairs = [(fake_resume(rng), fake_job_description(rng)) for _ in range(n)]
+    results["job_match_score"] = _time(lambda p: scorer.job_match_score(*p), pairs)
+
+    results["compare_skills"] = _time(lambda p: skills.compare_skills(*p), pairs)
+
+    resume = fake_resume(rng)
+    jobs = [fake_job_description(rng) for _ in range(args.batch)]
+    results[f"batch_job_match_scores_{args.batch}"] = _time(
+        lambda _: scorer.batch_job_match_scores(resume, jobs), range(max(1, n // 5))
+    )
+
+    long_text = "\n".join(fake_resume(rng, n_bullets=40) for _ in range(args.pdf_pages))
+    results["render_pdf"] = _time(lambda _: file_utils.render_pdf(long_text), range(n))
+
+    pdf_bytes = file_utils.render_pdf(long_text)
+    results["read_pdf"] = _time(lambda _: file_utils.read_pdf(BytesIO(pdf_bytes)), range(n))
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        saved_dir, file_utils.OUTPUT_DIR = file_utils.OUTPUT_DIR, out_dir
+        try:
+            results["save_pdf"] = _time(lambda i: file_utils.save_pdf(long_text, f"bench_{i}.pdf"), range(n))
+        finally:
+            file_utils.OUTPUT_DIR = saved_dir
+
+    return results
+
+
+def add_arguments(ap):
+    ap.add_argument("--iterations", type=int, default=50)
+    ap.add_argument("--corpus", type=int, default=500, help="documents in the IDF model")
+    ap.add_argument("--batch", type=int, default=50, help="jobs per batch_job_match_scores call")
+    ap.add_argument("--pdf-pages", type=int, default=3, help="approximate pages in the PDF benchmarks")
+    ap.add_argument("--seed", type=int, default=7)
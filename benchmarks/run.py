@@ -0,0 +1,145 @@
+"""Run the benchmarks and write results as JSON.
+
+From the repo root:
+
+    python -m benchmarks.run load --scenario mixed --users 8 --duration 30
+    python -m benchmarks.run micro --iterations 50
+    python -m benchmarks.run compaction --users 4 --duration 20 --jd-boilerplate 6
+    python -m benchmarks.run compare benchmarks/results/OLD.json benchmarks/results/NEW.json
+
+`compare` exits with status 1 when any latency percentile or throughput
+moved the wrong way by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _meta(args):
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("func", "out")},
+    }
+
+
+def _write(results, args):
+    path = args.out
+    if not path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{args.command}-{stamp}-{results['meta']['commit'] or 'nogit'}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def _print_table(section):
+    print(f"{'metric':32} {'count':>6} {'err':>4} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>9}")
+    for name, s in section.items():
+        fmt = lambda v: f"{v:10.2f}" if v is not None else f"{'-':>10}"
+        tput = f"{s['throughput_per_s']:9.2f}" if s["throughput_per_s"] is not None else f"{'-':>9}"
+        print(f"{name:32} {s['count']:6d} {s['errors']:4d} {fmt(s['p50_ms'])} {fmt(s['p95_ms'])} {fmt(s['p99_ms'])} {tput}")
+
+
+def cmd_load(args):
+    from benchmarks.load import run_load
+
+    results = {"meta": _meta(args), "load": {args.scenario: run_load(args)}}
+    _print_table(results["load"][args.scenario])
+    print(f"wrote {_write(results, args)}")
+
+
+def cmd_compaction(args):
+    from benchmarks.load import run_compaction
+
+    results = {"meta": _meta(args), "compaction": run_compaction(args)}
+    section = results["compaction"]
+    _print_table({k: v for k, v in section.items() if isinstance(v, dict)})
+    print(f"p50 speedup: {section['p50_speedup']}x")
+    print(f"wrote {_write(results, args)}")
+
+
+def cmd_micro(args):
+    # Keep the IDF model and databases of the working tree untouched.
+    os.environ.setdefault("RESUME_AI_DATA_DIR", tempfile.mkdtemp(prefix="resume-ai-bench-"))
+    from benchmarks.micro import run_micro
+
+    results = {"meta": _meta(args), "micro": run_micro(args)}
+    _print_table(results["micro"])
+    print(f"wrote {_write(results, args)}")
+
+
+def cmd_compare(args):
+    from benchmarks.stats import compare
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    rows, regressed = compare(base, new, args.threshold)
+    if not rows:
+        print("no metrics in common")
+        return
+    print(f"{base['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    for name, field, a, b, change, worse in rows:
+        flag = "  REGRESSION" if worse else ""
+        print(f"{name:40} {field:17} {a:10.2f} -> {b:10.2f} {change:+7.1%}{flag}")
+    if regressed:
+        sys.exit(1)
+
+
+def main():
+    from benchmarks import load, micro
+
+    ap = argparse.ArgumentParser(description="Resume AI benchmarks")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("load", help="concurrent users against the HTTP API")
+    load.add_arguments(p)
+    p.add_argument("--out", help="result file (default: benchmarks/results/...)")
+    p.set_defaults(func=cmd_load)
+
+    p = sub.add_parser("compaction", help="/generate with prompt compaction off vs on")
+    load.add_arguments(p)
+    p.set_defaults(jd_boilerplate=6)
+    p.add_argument("--out", help="result file (default: benchmarks/results/...)")
+    p.set_defaults(func=cmd_compaction)
+
+    p = sub.add_parser("micro", help="in-process scoring and PDF benchmarks")
+    micro.add_arguments(p)
+    p.add_argument("--out", help="result file (default: benchmarks/results/...)")
+    p.set_defaults(func=cmd_micro)
+
+    p = sub.add_parser("compare", help="diff two result files")
+    p.add_argument("base")
+    p.add_argument("new")
+    p.add_argument("--threshold", type=float, default=0.10, help="allowed relative change")
+    p.set_defaults(func=cmd_compare)
+
+    args = ap.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
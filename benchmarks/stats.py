@@ -0,0 +1,64 @@
+"""Latency summaries and comparisons between two result files."""
+
+
+def percentile(sorted_values, q):
+    """Linear-interpolated percentile (q in 0..100) of an already sorted list."""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(latencies, elapsed=None, errors=0) -> dict:
+    """p50/p95/p99 in milliseconds plus throughput in operations per second."""
+    values = sorted(latencies)
+    ms = lambda v: round(v * 1000, 3) if v is not None else None
+    summary = {
+        "count": len(values),
+        "errors": errors,
+        "mean_ms": ms(sum(values) / len(values)) if values else None,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else None,
+    }
+    if elapsed is None:
+        elapsed = sum(values)
+    summary["throughput_per_s"] = round(len(values) / elapsed, 3) if elapsed else None
+    return summary
+
+
+def _flatten(results, prefix=""):
+    """Map "section/name" -> summary for every summary dict in a result file."""
+    out = {}
+    for key, value in results.items():
+        if key == "meta" or not isinstance(value, dict):
+            continue
+        name = f"{prefix}{key}"
+        if "p50_ms" in value:
+            out[name] = value
+        else:
+            out.update(_flatten(value, name + "/"))
+    return out
+
+
+def compare(base: dict, new: dict, threshold: float = 0.10):
+    """Rows of (metric, field, base, new, change) and whether anything regressed.
+
+    A regression is a latency percentile that grew, or a throughput that
+    fell, by more than `threshold` (a fraction).
+    """
+    base_flat, new_flat = _flatten(base), _flatten(new)
+    rows, regressed = [], False
+    for name in sorted(set(base_flat) & set(new_flat)):
+        for field in ("p50_ms", "p95_ms", "p99_ms", "throughput_per_s"):
+            a, b = base_flat[name].get(field), new_flat[name].get(field)
+            if not a or b is None:
+                continue
+            change = (b - a) / a
+            worse = change < -threshold if field == "throughput_per_s" else change > threshold
+            regressed = regressed or worse
+            rows.append((name, field, a, b, change, worse))
+    return rows, regressed
@@ -0,0 +1,123 @@
+"""Stand-in for the RapidAPI JSearch /search endpoint.
+
+Returns deterministic postings per (query, page) in the JSearch response
+shape after a configurable delay. Point the backend at it with
+JSEARCH_URL=http://127.0.0.1:<port>/search and any RAPIDAPI_KEY:
+
+    python -m benchmarks.stub_jsearch --port 18500 --latency 0.3
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.data import fake_job_description
+
+CITIES = [("Bengaluru", "KA"), ("Pune", "MH"), ("Hyderabad", "TG"), ("Chennai", "TN"), ("Noida", "UP")]
+EMPLOYERS = ["Acme Analytics", "Nimbus Cloud", "Orbit Labs", "Quartz Systems", "Vertex Retail"]
+TYPES = ["FULLTIME", "CONTRACTOR", "INTERN"]
+
+
+class JSearchConfig:
+    def __init__(self, latency=0.3, jitter=0.1, per_page=10):
+        self.latency = latency
+        self.jitter = jitter
+        self.per_page = per_page
+
+
+def fake_postings(query: str, page: int, n: int) -> list:
+    seed = int(hashlib.sha256(f"{query}|{page}".encode()).hexdigest()[:12], 16)
+    rng = random.Random(seed)
+    title = query.split(" in ")[0].strip().title() or "Engineer"
+    postings = []
+    for i in range(n):
+        city, state = rng.choice(CITIES)
+        job_id = f"stub-{seed:x}-{i}"
+        postings.append({
+            "job_id": job_id,
+            "job_title": f"{rng.choice(['', 'Senior ', 'Junior ', 'Lead '])}{title}",
+            "employer_name": rng.choice(EMPLOYERS),
+            "job_publisher": "StubBoard",
+            "job_employment_type": rng.choice(TYPES),
+            "job_apply_link": f"https://jobs.example.com/{job_id}",
+            "job_city": city,
+            "job_state": state,
+            "job_country": "IN",
+            "job_description": fake_job_description(rng),
+        })
+    return postings
+
+
+def make_handler(config: JSearchConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/search":
+                status, data = 404, {"message": "not found"}
+            elif not self.headers.get("X-RapidAPI-Key"):
+                status, data = 401, {"message": "Invalid API key"}
+            else:
+                qs = parse_qs(url.query)
+                query = qs.get("query", [""])[0]
+                page = int(qs.get("page", ["1"])[0])
+                time.sleep(max(0.0, config.latency + random.uniform(-config.jitter, config.jitter)))
+                status, data = 200, {
+                    "status": "OK",
+                    "request_id": hashlib.md5(self.path.encode()).hexdigest(),
+                    "parameters": {"query": query, "page": page, "num_pages": 1},
+                    "data": fake_postings(query, page, config.per_page),
+                }
+
+            out = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+    return Handler
+
+
+def start(port=0, config=None, host="127.0.0.1"):
+    """Serve in a daemon thread; returns (server, search_url)."""
+    server = ThreadingHTTPServer((host, port), make_handler(config or JSearchConfig()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/search"
+
+
+def add_arguments(ap):
+    ap.add_argument("--jsearch-latency", type=float, default=0.3)
+    ap.add_argument("--jsearch-jitter", type=float, default=0.1)
+    ap.add_argument("--jsearch-per-page", type=int, default=10)
+
+
+def config_from_args(args) -> JSearchConfig:
+    return JSearchConfig(latency=args.jsearch_latency, jitter=args.jsearch_jitter,
+                         per_page=args.jsearch_per_page)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=18500)
+    add_arguments(ap)
+    args = ap.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config_from_args(args)))
+    server.daemon_threads = True
+    print(f"stub JSearch on http://{args.host}:{args.port}/search")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Stand-in for an Ollama server with a tunable cost model.
+
+Serves /api/generate (streamed and not), /api/embeddings, /api/embed,
+/api/tags and /api/ps with the same response shapes and timing fields as
+Ollama, so the backend can be load-tested without a GPU:
+
+    python -m benchmarks.stub_ollama --port 11434 --tokens-per-second 40
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "python developer built scalable services with fastapi docker and postgresql "
+    "led a team delivering data pipelines on aws improved latency by forty percent"
+).split()
+EMBEDDING_DIM = 64
+DEFAULT_KEEP_ALIVE_SECONDS = 300
+
+
+class StubConfig:
+    """Cost model: load once per model, then prompt eval + per-token decode."""
+
+    def __init__(self, latency=0.01, tokens_per_second=200.0, prompt_tokens_per_second=4000.0,
+                 response_tokens=60, load_seconds=0.5, parallel=4, malformed_json_rate=0.0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.response_tokens = response_tokens
+        self.load_seconds = load_seconds
+        self.parallel = parallel
+        # Share of format="json" replies that are cut off, to exercise fallbacks.
+        self.malformed_json_rate = malformed_json_rate
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def keep_alive_seconds(value) -> float:
+    """Ollama keep_alive ("5m", "1h", "30s", seconds, negative = forever) in seconds."""
+    if value is None:
+        return DEFAULT_KEEP_ALIVE_SECONDS
+    m = re.fullmatch(r"\s*(-?\d+(?:\.\d+)?)\s*([smh]?)\s*", str(value))
+    if not m:
+        return DEFAULT_KEEP_ALIVE_SECONDS
+    seconds = float(m.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[m.group(2)]
+    return float("inf") if seconds < 0 else seconds
+
+
+def fake_embedding(text: str, dim: int = EMBEDDING_DIM) -> list:
+    digest = b""
+    seed = text.encode("utf-8")
+    while len(digest) < dim:
+        digest += hashlib.sha256(seed + len(digest).to_bytes(4, "little")).digest()
+    return [(b - 127.5) / 127.5 for b in digest[:dim]]
+
+
+class StubOllama:
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._loaded = {}  # model -> unload time
+        self._slots = {}
+
+    def _slot(self, model):
+        with self._lock:
+            self.requests += 1
+            if model not in self._slots:
+                self._slots[model] = threading.Semaphore(self.config.parallel)
+            return self._slots[model]
+
+    def _load(self, model, keep_alive=None) -> int:
+        """Sleep for a cold load unless the model is still loaded; return load_duration ns.
+
+        Like Ollama, each request pushes the unload time keep_alive further out.
+        """
+        now = time.time()
+        with self._lock:
+            cold = self._loaded.get(model, 0) <= now
+            self._loaded[model] = now + keep_alive_seconds(keep_alive)
+        if not cold:
+            return 0
+        time.sleep(self.config.load_seconds)
+        return int(self.config.load_seconds * 1e9)
+
+    def response_tokens(self, payload):
+        n = int((payload.get("options") or {}).get("num_predict") or self.config.response_tokens)
+        if payload.get("format") == "json":
+            # One reply shaped like SINGLE_PASS_PROMPT asks for, n words per field.
+            text = " ".join(WORDS[i % len(WORDS)] for i in range(n))
+            body = json.dumps({k: text for k in ("ats_resume", "cover_letter", "missing_skills", "linkedin_summary")})
+            if random.random() < self.config.malformed_json_rate:
+                body = body[:len(body) // 2]
+            return [body[i:i + 16] for i in range(0, len(body), 16)]
+        return [WORDS[i % len(WORDS)] + " " for i in range(n)]
+
+    def generate(self, payload, emit=None) -> dict:
+        """Run one generation, calling emit(chunk) per token when streaming."""
+        model = payload.get("model", "")
+        cfg = self.config
+        with self._slot(model):
+            load_ns = self._load(model, payload.get("keep_alive"))
+            time.sleep(cfg.latency)
+            if not payload.get("prompt"):
+                # Ollama treats an empty prompt as a load request.
+                return {"model": model, "response": "", "done": True, "done_reason": "load",
+                        "load_duration": load_ns, "total_duration": load_ns}
+
+            prompt_tokens = estimate_tokens(payload.get("prompt", ""))
+            prompt_s = prompt_tokens / cfg.prompt_tokens_per_second
+            time.sleep(prompt_s)
+
+            tokens = self.response_tokens(payload)
+            started = time.perf_counter()
+            for token in tokens:
+                time.sleep(1 / cfg.tokens_per_second)
+                if emit:
+                    emit({"model": model, "response": token, "done": False})
+            eval_s = time.perf_counter() - started
+
+        return {
+            "model": model,
+            "response": "" if emit else "".join(tokens),
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((prompt_s + eval_s + cfg.latency) * 1e9) + load_ns,
+            "load_duration": load_ns,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prompt_s * 1e9),
+            "eval_count": len(tokens),
+            "eval_duration": int(eval_s * 1e9),
+        }
+
+    def ps(self) -> dict:
+        now = time.time()
+        with self._lock:
+            loaded = {m: t for m, t in self._loaded.items() if t > now}
+        return {"models": [
+            {
+                "name": f"{m}:latest", "model": f"{m}:latest", "size_vram": 0,
+                "expires_at": datetime.fromtimestamp(min(t, 4102444800), timezone.utc).isoformat(),
+            }
+            for m, t in loaded.items()
+        ]}
+
+
+def make_handler(stub: StubOllama):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, data, status=200):
+            out = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+        def _chunk(self, data):
+            line = (json.dumps(data) + "\n").encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path == "/api/ps":
+                self._json(stub.ps())
+            elif self.path == "/api/tags":
+                self._json({"models": stub.ps()["models"]})
+            else:
+                self._json({"error": "not found"}, status=404)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return self._json({"error": "invalid JSON"}, status=400)
+
+            if self.path == "/api/embeddings":
+                return self._json({"embedding": fake_embedding(payload.get("prompt", ""))})
+            if self.path == "/api/embed":
+                inputs = payload.get("input", [])
+                inputs = [inputs] if isinstance(inputs, str) else inputs
+                return self._json({"model": payload.get("model"),
+                                   "embeddings": [fake_embedding(t) for t in inputs]})
+            if self.path != "/api/generate":
+                return self._json({"error": "not found"}, status=404)
+
+            if payload.get("stream", True):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self._chunk(stub.generate(payload, emit=self._chunk))
+                self.wfile.write(b"0\r\n\r\n")
+            else:
+                self._json(stub.generate(payload))
+
+    return Handler
+
+
+def start(port=0, config=None, host="127.0.0.1"):
+    """Serve in a daemon thread; returns (server, base_url, stub)."""
+    stub = StubOllama(config or StubConfig())
+    server = ThreadingHTTPServer((host, port), make_handler(stub))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}", stub
+
+
+def add_arguments(ap):
+    ap.add_argument("--ollama-latency", type=float, default=0.01, help="fixed seconds per request")
+    ap.add_argument("--tokens-per-second", type=float, default=200.0)
+    ap.add_argument("--prompt-tokens-per-second", type=float, default=4000.0)
+    ap.add_argument("--response-tokens", type=int, default=60)
+    ap.add_argument("--load-seconds", type=float, default=0.5, help="cold load per model")
+    ap.add_argument("--ollama-parallel", type=int, default=4, help="like OLLAMA_NUM_PARALLEL")
+    ap.add_argument("--malformed-json-rate", type=float, default=0.0, help="share of broken format=json replies")
+
+
+def config_from_args(args) -> StubConfig:
+    return StubConfig(
+        latency=args.ollama_latency,
+        tokens_per_second=args.tokens_per_second,
+        prompt_tokens_per_second=args.prompt_tokens_per_second,
+        response_tokens=args.response_tokens,
+        load_seconds=args.load_seconds,
+        parallel=args.ollama_parallel,
+        malformed_json_rate=args.malformed_json_rate,
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=11434)
+    add_arguments(ap)
+    args = ap.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(StubOllama(config_from_args(args))))
+    server.daemon_threads = True
+    print(f"stub Ollama on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
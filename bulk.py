@@ -0,0 +1,354 @@
+"""Bulk application mode: one resume against a file of job descriptions.
+
+    python bulk.py --user alice --resume resume.txt --jobs jobs.csv --workers 2
+    python bulk.py --user alice --continue <batch_id>
+
+Results are printed as NDJSON; progress is checkpointed per job in SQLite,
+so a batch that was interrupted resumes with the jobs that did not finish.
+"""
+import argparse
+import contextvars
+import csv
+import io
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from db import (
+    create_bulk_batch, get_bulk_batch, get_bulk_items,
+    update_bulk_batch, claim_bulk_item, update_bulk_item, heartbeat_bulk_items
+)
+from metrics import Counter, Gauge
+from model_config import MODELS
+
+BULK_WORKERS = int(os.getenv("BULK_WORKERS", "2"))
+BULK_MAX_JOBS = int(os.getenv("BULK_MAX_JOBS", "200"))
+# Attempts per job when Ollama answers 429 (its queue is full).
+BULK_BUSY_RETRIES = int(os.getenv("BULK_BUSY_RETRIES", "5"))
+# Running items are heartbeated by the process running them, as in job_queue;
+# an item whose heartbeat is older than BULK_STALE_SECONDS belonged to a run
+# that died, and may be taken over.
+BULK_HEARTBEAT_SECONDS = int(os.getenv("BULK_HEARTBEAT_SECONDS", "5"))
+BULK_STALE_SECONDS = int(os.getenv("BULK_STALE_SECONDS", "20"))
+
+DESCRIPTION_COLUMNS = ("description", "job_description", "job", "jd")
+TITLE_COLUMNS = ("title", "job_title")
+
+BULK_ITEMS = Counter("bulk_items_total", "Bulk jobs processed", labels=("status",))
+BULK_JOBS_PER_MINUTE = Gauge("bulk_jobs_per_minute", "Throughput of the last finished bulk run")
+
+
+class BulkBusy(Exception):
+    pass
+
+
+def _pick(row: dict, names):
+    for key, value in row.items():
+        if key and key.strip().lower() in names and value and str(value).strip():
+            return str(value).strip()
+    return ""
+
+
+def parse_jobs(data: str, fmt: str) -> list:
+    """[{"title", "description"}] from CSV (with a header row) or JSONL text."""
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(data))
+        if not reader.fieldnames or not {f.strip().lower() for f in reader.fieldnames} & set(DESCRIPTION_COLUMNS):
+            raise ValueError(f"CSV needs one of the columns: {', '.join(DESCRIPTION_COLUMNS)}")
+        rows = [(reader.line_num, row) for row in reader]
+    elif fmt == "jsonl":
+        rows = []
+        for n, line in enumerate(data.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                raise ValueError(f"Line {n} is not valid JSON")
+            rows.append((n, {"description": row} if isinstance(row, str) else row))
+    else:
+        raise ValueError(f"Unsupported format '{fmt}', use csv or jsonl")
+
+    jobs = []
+    for n, row in rows:
+        if not isinstance(row, dict):
+            raise ValueError(f"Line {n} must be an object or a string")
+        description = _pick(row, DESCRIPTION_COLUMNS)
+        if not description:
+            raise ValueError(f"Line {n} has no job description")
+        jobs.append({"title": _pick(row, TITLE_COLUMNS), "description": description})
+
+    if not jobs:
+        raise ValueError("No job descriptions found")
+    if len(jobs) > BULK_MAX_JOBS:
+        raise ValueError(f"At most {BULK_MAX_JOBS} job descriptions per batch")
+    return jobs
+
+
+def create_batch(user_id, request: dict, jobs: list) -> str:
+    """request holds the resume and the /generate options shared by every job."""
+    batch_id = uuid.uuid4().hex
+    create_bulk_batch(batch_id, user_id, request, jobs)
+    return batch_id
+
+
+def batch_status(row) -> dict:
+    items = get_bulk_items(row["id"], with_results=False)
+    counts = {}
+    for item in items:
+        counts[item["status"]] = counts.get(item["status"], 0) + 1
+    return {
+        "batch_id": row["id"],
+        "status": row["status"],
+        "total": row["total"],
+        "counts": counts,
+        "failed": [{"position": i["position"], "title": i["job_title"], "error": i["error"]}
+                   for i in items if i["status"] == "failed"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def _busy_retry_after(e):
+    """Seconds to wait if e is Ollama's queue being full, else None."""
+    if getattr(e, "status_code", None) == 429:
+        return int((getattr(e, "headers", None) or {}).get("Retry-After", 1))
+    return getattr(e, "retry_after", None)
+
+
+class BulkRunner:
+    """Runs batches on a bounded worker pool.
+
+    runner(user_id, request) runs one /generate request and returns its
+    response; it is expected to save the history row itself.
+    """
+
+    def __init__(self, runner, workers=BULK_WORKERS):
+        self.runner = runner
+        self.workers = max(1, workers)
+        # The API server and the CLI may run the same batch; each claims items as itself.
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._active = set()
+        self._lock = threading.Lock()
+        self._heartbeat_thread = None
+
+    def is_running(self, batch_id: str) -> bool:
+        with self._lock:
+            return batch_id in self._active
+
+    def _start_heartbeat(self):
+        # Started on the first run rather than in __init__, which runs at import.
+        with self._lock:
+            if self._heartbeat_thread is None:
+                self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="bulk-heartbeat", daemon=True)
+                self._heartbeat_thread.start()
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(BULK_HEARTBEAT_SECONDS)
+            try:
+                heartbeat_bulk_items(self.owner)
+            except sqlite3.OperationalError:
+                # Locked database; try again on the next beat.
+                continue
+
+    def _run_item(self, batch, request, item) -> dict:
+        position = item["position"]
+        stale_before = (datetime.utcnow() - timedelta(seconds=BULK_STALE_SECONDS)).isoformat()
+        if not claim_bulk_item(batch["id"], position, self.owner, stale_before):
+            # Another process (the CLI or a second worker) is generating it.
+            return {"type": "result", "position": position, "title": item["job_title"],
+                    "status": "skipped", "error": "Already running in another process"}
+        job_request = {**request, "job": item["job_description"], "job_title": item["job_title"]}
+
+        for attempt in range(1, BULK_BUSY_RETRIES + 1):
+            try:
+                result = self.runner(batch["user_id"], job_request)
+                break
+            except Exception as e:
+                retry_after = _busy_retry_after(e)
+                if retry_after is not None and attempt < BULK_BUSY_RETRIES:
+                    time.sleep(retry_after)
+                    continue
+                error = str(getattr(e, "detail", None) or str(e) or e.__class__.__name__)
+                update_bulk_item(batch["id"], position, "failed", error=error)
+                BULK_ITEMS.inc(status="failed")
+                return {"type": "result", "position": position, "title": item["job_title"],
+                        "status": "failed", "error": error}
+
+        update_bulk_item(batch["id"], position, "done", result=result)
+        BULK_ITEMS.inc(status="done")
+        return {"type": "result", "position": position, "title": item["job_title"],
+                "status": "done", "result": result}
+
+    def run(self, batch_id: str):
+        """Yield one event per job as it finishes, then a summary.
+
+        Jobs finished by an earlier run are replayed first and not re-run;
+        failed and unfinished ones run again. Closing the generator early
+        (e.g. the client disconnects) lets running jobs finish and marks the
+        batch interrupted; the batch counts as running until they have.
+        """
+        with self._lock:
+            if batch_id in self._active:
+                raise BulkBusy(f"Batch {batch_id} is already running")
+            self._active.add(batch_id)
+        self._start_heartbeat()
+
+        futures = []
+        try:
+            batch = get_bulk_batch(batch_id)
+            request = json.loads(batch["request"])
+            items = get_bulk_items(batch_id)
+            todo = [i for i in items if i["status"] != "done"]
+
+            yield {"type": "batch", "batch_id": batch_id, "total": len(items),
+                   "resumed": len(items) - len(todo), "workers": self.workers}
+            for item in items:
+                if item["status"] == "done":
+                    yield {"type": "result", "position": item["position"], "title": item["job_title"],
+                           "status": "done", "result": json.loads(item["result"]), "resumed": True}
+
+            update_bulk_batch(batch_id, "running")
+            counts = {"done": 0, "failed": 0, "skipped": 0}
+            t0 = time.perf_counter()
+            pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk")
+            finished = False
+            try:
+                futures += [
+                    pool.submit(contextvars.copy_context().run, self._run_item, batch, request, item)
+                    for item in todo
+                ]
+                for future in as_completed(futures):
+                    event = future.result()
+                    counts[event["status"]] += 1
+                    yield event
+                finished = True
+            finally:
+                # Jobs not started yet stay pending for the next run.
+                pool.shutdown(wait=False, cancel_futures=True)
+                if not finished:
+                    update_bulk_batch(batch_id, "interrupted")
+
+            elapsed = time.perf_counter() - t0
+            processed = counts["done"] + counts["failed"]
+            jobs_per_minute = round(processed / elapsed * 60, 2) if elapsed > 0 else None
+            if processed:
+                BULK_JOBS_PER_MINUTE.set(jobs_per_minute)
+            if not counts["skipped"]:
+                update_bulk_batch(batch_id, "done" if not counts["failed"] else "done_with_errors")
+            yield {
+                "type": "summary", "batch_id": batch_id, "total": len(items),
+                "processed": processed, "done": counts["done"], "failed": counts["failed"],
+                "skipped": counts["skipped"], "resumed": len(items) - len(todo),
+                "elapsed_seconds": round(elapsed, 2), "jobs_per_minute": jobs_per_minute,
+            }
+        finally:
+            self._release_when_done(batch_id, futures)
+
+    def _release_when_done(self, batch_id, futures):
+        # Jobs already running when the stream stopped keep going; until they
+        # finish, a resume would pick the same items up again.
+        pending = [f for f in futures if not f.done()]
+        remaining = [len(pending)]
+
+        def release(_=None):
+            with self._lock:
+                remaining[0] -= 1
+                if remaining[0] <= 0:
+                    self._active.discard(batch_id)
+
+        if not pending:
+            release()
+        for f in pending:
+            f.add_done_callback(release)
+
+
+def ndjson(events):
+    for event in events:
+        yield json.dumps(event) + "\n"
+
+
+# -------------------- CLI --------------------
+def main():
+    ap = argparse.ArgumentParser(description="Run /generate for one resume against many job descriptions.")
+    ap.add_argument("--user", required=True, help="username the history rows are saved under")
+    ap.add_argument("--resume", help="resume text file")
+    ap.add_argument("--jobs", help="CSV or JSONL file of job descriptions")
+    ap.add_argument("--format", choices=("csv", "jsonl"), help="defaults to the --jobs file extension")
+    ap.add_argument("--continue", dest="batch_id", help="resume an interrupted batch")
+    ap.add_argument("--workers", type=int, default=BULK_WORKERS)
+    ap.add_argument("--model", choices=MODELS, default="llama3")
+    ap.add_argument("--mode", choices=("pipeline", "single_pass"), default="pipeline")
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--semantic", action="store_true")
+    ap.add_argument("--out", help="write NDJSON here instead of stdout")
+    args = ap.parse_args()
+
+    # Imported here to keep the API import graph out of the module. Only the
+    # storage is initialised; the server's workers would claim other users' jobs.
+    import backend
+    from db import get_user_by_username
+
+    backend.init_storage()
+
+    user = get_user_by_username(args.user)
+    if not user:
+        ap.error(f"Unknown user '{args.user}'")
+
+    if args.batch_id:
+        batch = get_bulk_batch(args.batch_id, user["id"])
+        if not batch:
+            ap.error(f"Unknown batch '{args.batch_id}'")
+        batch_id = batch["id"]
+    else:
+        if not args.resume or not args.jobs:
+            ap.error("--resume and --jobs are required unless --continue is given")
+        fmt = args.format or ("csv" if args.jobs.lower().endswith(".csv") else "jsonl")
+        with open(args.resume, encoding="utf-8") as f:
+            resume = f.read()
+        with open(args.jobs, encoding="utf-8") as f:
+            try:
+                jobs = parse_jobs(f.read(), fmt)
+            except ValueError as e:
+                ap.error(str(e))
+        request = {"resume": resume, "model": args.model, "mode": args.mode,
+                   "use_cache": not args.no_cache, "semantic": args.semantic}
+        batch_id = create_batch(user["id"], request, jobs)
+
+    out = open(args.out, "a", encoding="utf-8") if args.out else sys.stdout
+    summary = None
+    try:
+        for event in BulkRunner(backend.run_bulk_job, args.workers).run(batch_id):
+            out.write(json.dumps(event) + "\n")
+            out.flush()
+            if event["type"] == "result":
+                print(f"[{event['position']}] {event['title'] or '-'}: {event['status']}", file=sys.stderr)
+            elif event["type"] == "summary":
+                summary = event
+    except KeyboardInterrupt:
+        print(f"Interrupted; continue with: python bulk.py --user {args.user} --continue {batch_id}",
+              file=sys.stderr)
+        sys.exit(130)
+    finally:
+        if args.out:
+            out.close()
+
+    print(
+        f"Batch {batch_id}: {summary['done']} done, {summary['failed']} failed, "
+        f"{summary['skipped']} running elsewhere, "
+        f"{summary['resumed']} from an earlier run, {summary['elapsed_seconds']}s, "
+        f"{summary['jobs_per_minute']} jobs/min",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
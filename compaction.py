@@ -0,0 +1,169 @@
+import os
+import re
+
+from model_config import parse_model_map
+from resume_parser import BULLET_RE
+
+# Context window per model. It is sent to Ollama as num_ctx, so the server
+# does not fall back to its smaller default and cut the prompt's head off.
+DEFAULT_CONTEXT_TOKENS = int(os.getenv("CONTEXT_TOKENS", "8192"))
+MODEL_CONTEXT_TOKENS = parse_model_map("MODEL_CONTEXT_TOKENS", int, {
+    "llama3": 8192,
+    "mistral": 8192,
+    "gemma": 8192,
+})
+# Room left for the reply: one artifact, or all four in single-pass mode.
+RESPONSE_RESERVE_TOKENS = int(os.getenv("RESPONSE_RESERVE_TOKENS", "1024"))
+SINGLE_PASS_RESERVE_TOKENS = int(os.getenv("SINGLE_PASS_RESERVE_TOKENS", "3072"))
+# The resume is what gets rewritten, so the job description is trimmed first,
+# but never below this share of the budget.
+MIN_JOB_SHARE = 0.35
+
+BOILERPLATE_HEADINGS = re.compile(
+    r"^(benefits|perks|perks (and|&) benefits|what we offer|why join us|compensation( and benefits)?|"
+    r"equal (employment )?opportunity( employer)?|eeo( statement)?|diversity( and| &)? inclusion|"
+    r"accommodations?|privacy( notice| policy)?|how to apply|about (us|the company))\s*:?$",
+    re.IGNORECASE,
+)
+BOILERPLATE_LINE = re.compile(
+    r"equal opportunity employer|without regard to (race|age|sex)|reasonable accommodation|"
+    r"e-verify|protected veteran|sexual orientation|gender identity|applicant privacy|"
+    r"we do not accept unsolicited",
+    re.IGNORECASE,
+)
+JOB_HEADINGS = re.compile(
+    r"^(job description|about the (role|job|team)|responsibilities|key responsibilities|"
+    r"what you('|’)ll do|requirements|qualifications|(preferred|minimum|basic) qualifications|"
+    r"skills|must have|nice to have|experience|who you are|the role)\s*:?$",
+    re.IGNORECASE,
+)
+MARKUP_RE = re.compile(r"^[#*_\s]+|[*_\s]+$")
+
+
+def estimate_tokens(text: str) -> int:
+    # Llama-family tokenizers average roughly four characters per token.
+    return (len(text) + 3) // 4
+
+
+def _normalize(line: str) -> str:
+    return re.sub(r"\s+", " ", BULLET_RE.sub("", line)).strip().lower()
+
+
+def _is_heading(line: str) -> bool:
+    bare = MARKUP_RE.sub("", line)
+    if not bare or len(bare) > 60 or len(bare.split()) > 6:
+        return False
+    if BOILERPLATE_HEADINGS.match(bare) or JOB_HEADINGS.match(bare):
+        return True
+    letters = [c for c in bare if c.isalpha()]
+    return bare.endswith(":") or (len(letters) >= 3 and all(c.isupper() for c in letters))
+
+
+def strip_boilerplate(text: str):
+    """Drop benefits/EEO-style sections and lines, and repeated lines.
+
+    Returns (text, boilerplate_lines, duplicate_lines).
+    """
+    out, seen = [], set()
+    boilerplate = duplicates = 0
+    in_boilerplate = False
+    for line in text.splitlines():
+        bare = line.strip()
+        if not bare:
+            if out and out[-1]:
+                out.append("")
+            continue
+
+        if _is_heading(bare):
+            in_boilerplate = bool(BOILERPLATE_HEADINGS.match(MARKUP_RE.sub("", bare)))
+            if in_boilerplate:
+                boilerplate += 1
+                continue
+        if in_boilerplate or BOILERPLATE_LINE.search(bare):
+            boilerplate += 1
+            continue
+
+        key = _normalize(bare)
+        if key in seen and len(key) > 3:
+            duplicates += 1
+            continue
+        seen.add(key)
+        out.append(line.rstrip())
+
+    return "\n".join(out).strip(), boilerplate, duplicates
+
+
+def _cut_line(line: str, budget: int) -> str:
+    """Longest word-boundary prefix of line within budget tokens."""
+    limit = budget * 4
+    if limit <= 0:
+        return ""
+    cut = line[:limit]
+    if len(line) > limit and not line[limit].isspace():
+        # Drop the partial last word, unless it is the only one.
+        head = cut.rsplit(None, 1)[0] if len(cut.split()) > 1 else cut
+        cut = head
+    return cut.rstrip()
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Keep whole lines from the top until the budget is used up.
+
+    The first line that does not fit is cut at a word boundary, so a JD
+    pasted as one long line is shortened rather than dropped.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    kept, used = [], 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line + "\n")
+        if used + cost > budget:
+            kept.append(_cut_line(line, budget - used))
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept).rstrip()
+
+
+def context_tokens(model: str) -> int:
+    return MODEL_CONTEXT_TOKENS.get(model, DEFAULT_CONTEXT_TOKENS)
+
+
+def ollama_options(model: str) -> dict:
+    """Options for every request to `model`, so prompts get the context they were budgeted for."""
+    return {"num_ctx": context_tokens(model)}
+
+
+def context_budget(model: str, reserve: int = RESPONSE_RESERVE_TOKENS) -> int:
+    return context_tokens(model) - reserve
+
+
+def compact_inputs(resume: str, job: str, model: str, template: str = "",
+                   reserve: int = RESPONSE_RESERVE_TOKENS):
+    """Fit resume + job description into the model's budget for `template`.
+
+    Only the job description is stripped of boilerplate and duplicates;
+    either input is cut at a line boundary if the two still do not fit.
+    Returns (resume, job, report).
+    """
+    before = estimate_tokens(resume) + estimate_tokens(job)
+    job, boilerplate, duplicates = strip_boilerplate(job)
+
+    budget = max(0, context_budget(model, reserve) - estimate_tokens(template))
+    resume_tokens, job_tokens = estimate_tokens(resume), estimate_tokens(job)
+    truncated = resume_tokens + job_tokens > budget
+    if truncated:
+        job_budget = max(budget - resume_tokens, int(budget * MIN_JOB_SHARE))
+        job = truncate_to_tokens(job, job_budget)
+        resume = truncate_to_tokens(resume, budget - estimate_tokens(job))
+
+    after = estimate_tokens(resume) + estimate_tokens(job)
+    return resume, job, {
+        "tokens_before": before,
+        "tokens_after": after,
+        "tokens_removed": before - after,
+        "boilerplate_lines": boilerplate,
+        "duplicate_lines": duplicates,
+        "truncated": truncated,
+        "budget": budget,
+    }
@@ -1,14 +1,90 @@
+import hashlib
+import json
 import os
+import queue
+import re
 import sqlite3
+import zlib
 from datetime import datetime
 
+from metrics import timed
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "resume_ai.db")
+# Where the SQLite files and the IDF model live; benchmarks point this at a temp dir.
+DATA_DIR = os.getenv("RESUME_AI_DATA_DIR", BASE_DIR)
+DB_PATH = os.path.join(DATA_DIR, "resume_ai.db")
+# Idle connections kept for reuse; 0 opens a fresh connection per call.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=134217728",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class PooledConnection:
+    """sqlite3 connection whose close() hands it back to the pool."""
+
+    def __init__(self, conn, pool):
+        self._conn = conn
+        self._pool = pool
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+
+
+class ConnectionPool:
+    def __init__(self, path, size=DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        return PooledConnection(conn, self)
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        if self._idle.qsize() < self.size:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+
+pool = ConnectionPool(DB_PATH)
 
 def get_conn():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return pool.acquire()
 
 def init_db():
     conn = get_conn()
@@ -42,9 +118,260 @@ def init_db():
     )
     """)
 
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        title TEXT,
+        company TEXT,
+        location TEXT,
+        location_text TEXT,
+        employment_type TEXT,
+        apply_link TEXT,
+        publisher TEXT,
+        description TEXT,
+        fetched_at TEXT NOT NULL
+    )
+    """)
+
+    # Full-text index over jobs, kept in sync by triggers.
+    cur.executescript("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, company, description, location_text,
+        content='jobs', content_rowid='rowid', tokenize='porter unicode61'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, company, description, location_text)
+        VALUES (new.rowid, new.title, new.company, new.description, new.location_text);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description, location_text)
+        VALUES ('delete', old.rowid, old.title, old.company, old.description, old.location_text);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description, location_text)
+        VALUES ('delete', old.rowid, old.title, old.company, old.description, old.location_text);
+        INSERT INTO jobs_fts(rowid, title, company, description, location_text)
+        VALUES (new.rowid, new.title, new.company, new.description, new.location_text);
+    END;
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS generation_jobs (
+        id TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        request TEXT NOT NULL,
+        progress TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )
+    """)
+
+    # Bulk runs: one row per batch, one per job description, so an
+    # interrupted batch resumes from the items that are not done.
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS bulk_batches (
+        id TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        request TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS bulk_items (
+        batch_id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        job_title TEXT,
+        job_description TEXT NOT NULL,
+        status TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY(batch_id, position),
+        FOREIGN KEY(batch_id) REFERENCES bulk_batches(id)
+    )
+    """)
+
     conn.commit()
+    migrate(conn)
+    conn.close()
+
+# -------------------- BLOBS --------------------
+# Large history texts are stored once per distinct content, compressed.
+BLOB_FIELDS = (
+    "resume_input", "job_description",
+    "ats_resume", "cover_letter", "missing_skills", "linkedin_summary"
+)
+
+def _put_blob(cur, text):
+    raw = (text or "").encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+    packed = zlib.compress(raw, 6)
+    codec = "zlib"
+    if len(packed) >= len(raw):
+        packed, codec = raw, "raw"
+    cur.execute(
+        "INSERT OR IGNORE INTO blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+        (digest, codec, len(raw), packed)
+    )
+    return digest
+
+def _unpack_blob(codec, data):
+    raw = zlib.decompress(data) if codec == "zlib" else bytes(data)
+    return raw.decode("utf-8")
+
+def _get_blobs(cur, hashes):
+    hashes = list(set(hashes))
+    cur.execute(
+        f"SELECT hash, codec, data FROM blobs WHERE hash IN ({', '.join('?' * len(hashes))})",
+        hashes
+    )
+    return {h: _unpack_blob(codec, data) for h, codec, data in cur.fetchall()}
+
+def _storage_report(cur):
+    refs = " + ".join(
+        f"(SELECT size FROM blobs WHERE hash = history.{f}_hash)" for f in BLOB_FIELDS
+    )
+    rows, raw = cur.execute(f"SELECT COUNT(*), COALESCE(SUM({refs}), 0) FROM history").fetchone()
+    blobs, stored = cur.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM blobs").fetchone()
+    return {
+        "history_rows": rows,
+        "blobs": blobs,
+        "raw_bytes": raw,
+        "stored_bytes": stored,
+        "saved_bytes": raw - stored,
+        "ratio": round(stored / raw, 4) if raw else 1.0,
+    }
+
+def history_storage_report():
+    conn = get_conn()
+    report = _storage_report(conn.cursor())
     conn.close()
+    return report
+
+# -------------------- MIGRATIONS --------------------
+# Each step runs once, in order; PRAGMA user_version records how many ran.
+def _add_history_indexes(cur):
+    # Covers the history listing, so pages are served from the index alone.
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_history_user_listing
+        ON history(user_id, id DESC, job_title, created_at, job_match_score, model)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_generation_jobs_status
+        ON generation_jobs(status, created_at)
+    """)
+
+def _move_history_text_to_blobs(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )
+    """)
+    cur.execute(f"""
+        CREATE TABLE history_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            job_title TEXT,
+            created_at TEXT NOT NULL,
+            {", ".join(f"{f}_hash TEXT NOT NULL REFERENCES blobs(hash)" for f in BLOB_FIELDS)},
+            job_match_score REAL NOT NULL,
+            model TEXT NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    """)
+
+    read = cur.connection.cursor()
+    read.execute("SELECT * FROM history ORDER BY id")
+    moved = 0
+    while True:
+        rows = read.fetchmany(500)
+        if not rows:
+            break
+        for r in rows:
+            cur.execute(f"""
+                INSERT INTO history_new (
+                    id, user_id, job_title, created_at,
+                    {", ".join(f"{f}_hash" for f in BLOB_FIELDS)},
+                    job_match_score, model
+                )
+                VALUES ({", ".join("?" * (6 + len(BLOB_FIELDS)))})
+            """, (
+                r["id"], r["user_id"], r["job_title"], r["created_at"],
+                *(_put_blob(cur, r[f]) for f in BLOB_FIELDS),
+                r["job_match_score"], r["model"]
+            ))
+            moved += 1
+
+    cur.execute("DROP TABLE history")
+    cur.execute("ALTER TABLE history_new RENAME TO history")
+    _add_history_indexes(cur)
+
+    if moved:
+        report = _storage_report(cur)
+        print(
+            f"Moved {moved} history rows to blob storage: "
+            f"{report['raw_bytes']} -> {report['stored_bytes']} bytes "
+            f"({report['saved_bytes']} saved, run 'python db.py' to vacuum)"
+        )
+
+def _add_generation_job_owner(cur):
+    # Which worker process is running a job, and when it last said it was alive.
+    cur.execute("ALTER TABLE generation_jobs ADD COLUMN owner TEXT")
+    cur.execute("ALTER TABLE generation_jobs ADD COLUMN heartbeat_at TEXT")
+
+def _add_bulk_item_owner(cur):
+    # Same scheme for bulk items: a dead run's items can be taken over quickly.
+    cur.execute("ALTER TABLE bulk_items ADD COLUMN owner TEXT")
+    cur.execute("ALTER TABLE bulk_items ADD COLUMN heartbeat_at TEXT")
+
+MIGRATIONS = [
+    _add_history_indexes,
+    _move_history_text_to_blobs,
+    _add_generation_job_owner,
+    _add_bulk_item_owner,
+]
+
+def migrate(conn):
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        version = cur.execute("PRAGMA user_version").fetchone()[0]
+        for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+            step(cur)
+            cur.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+# Callbacks run with the username whenever a user row is written, so
+# in-process caches of user rows can drop stale entries.
+_user_change_listeners = []
 
+def on_user_change(callback):
+    _user_change_listeners.append(callback)
+
+def _user_changed(username):
+    for callback in _user_change_listeners:
+        callback(username)
+
+@timed("db.create_user")
 def create_user(username, email, password_hash):
     conn = get_conn()
     cur = conn.cursor()
@@ -54,7 +381,9 @@ def create_user(username, email, password_hash):
     """, (username, email, password_hash, datetime.utcnow().isoformat()))
     conn.commit()
     conn.close()
+    _user_changed(username)
 
+@timed("db.get_user_by_username")
 def get_user_by_username(username):
     conn = get_conn()
     cur = conn.cursor()
@@ -63,42 +392,70 @@ def get_user_by_username(username):
     conn.close()
     return user
 
+@timed("db.save_history")
 def save_history(user_id, job_title, resume_input, job_description,
                  ats_resume, cover_letter, missing_skills, linkedin_summary,
                  job_match_score, model):
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute("""
+    hashes = [
+        _put_blob(cur, text) for text in (
+            resume_input, job_description,
+            ats_resume, cover_letter, missing_skills, linkedin_summary
+        )
+    ]
+    cur.execute(f"""
         INSERT INTO history (
             user_id, job_title, created_at,
-            resume_input, job_description,
-            ats_resume, cover_letter, missing_skills, linkedin_summary,
+            {", ".join(f"{f}_hash" for f in BLOB_FIELDS)},
             job_match_score, model
         )
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (
         user_id, job_title, datetime.utcnow().isoformat(),
-        resume_input, job_description,
-        ats_resume, cover_letter, missing_skills, linkedin_summary,
+        *hashes,
         job_match_score, model
     ))
     conn.commit()
     conn.close()
 
-def get_user_history(user_id, limit=30):
+@timed("db.get_user_history")
+def get_user_history(user_id, limit=30, before_id=None, job_title=None,
+                     model=None, min_score=None, max_score=None):
+    # Keyset pagination: pass the last id of a page as before_id for the next.
+    where = ["user_id = ?"]
+    params = [user_id]
+    if before_id is not None:
+        where.append("id < ?")
+        params.append(before_id)
+    if job_title:
+        where.append("job_title LIKE ? ESCAPE '\\'")
+        escaped = job_title.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params.append(f"%{escaped}%")
+    if model:
+        where.append("model = ?")
+        params.append(model)
+    if min_score is not None:
+        where.append("job_match_score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        where.append("job_match_score <= ?")
+        params.append(max_score)
+
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute("""
+    cur.execute(f"""
         SELECT id, job_title, created_at, job_match_score, model
-        FROM history
-        WHERE user_id = ?
+        FROM history INDEXED BY idx_history_user_listing
+        WHERE {" AND ".join(where)}
         ORDER BY id DESC
         LIMIT ?
-    """, (user_id, limit))
+    """, (*params, limit))
     rows = cur.fetchall()
     conn.close()
     return rows
 
+@timed("db.get_history_item")
 def get_history_item(history_id, user_id):
     conn = get_conn()
     cur = conn.cursor()
@@ -108,5 +465,303 @@ def get_history_item(history_id, user_id):
         WHERE id = ? AND user_id = ?
     """, (history_id, user_id))
     row = cur.fetchone()
+    if not row:
+        conn.close()
+        return None
+
+    texts = _get_blobs(cur, [row[f"{f}_hash"] for f in BLOB_FIELDS])
+    conn.close()
+
+    item = {k: row[k] for k in row.keys() if not k.endswith("_hash")}
+    for f in BLOB_FIELDS:
+        item[f] = texts[row[f"{f}_hash"]]
+    return item
+
+@timed("db.get_corpus_texts")
+def get_corpus_texts():
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT codec, data FROM blobs
+        WHERE hash IN (
+            SELECT job_description_hash FROM history
+            UNION
+            SELECT resume_input_hash FROM history
+        )
+    """)
+    texts = [_unpack_blob(codec, data) for codec, data in cur.fetchall()]
+    conn.close()
+    return texts
+
+JOB_COLUMNS = (
+    "job_id", "title", "company", "location", "location_text",
+    "employment_type", "apply_link", "publisher", "description"
+)
+
+@timed("db.upsert_jobs")
+def upsert_jobs(jobs):
+    rows = [
+        (*(j.get(c) for c in JOB_COLUMNS), datetime.utcnow().isoformat())
+        for j in jobs if j.get("job_id")
+    ]
+    if not rows:
+        return
+    updates = ", ".join(f"{c} = excluded.{c}" for c in JOB_COLUMNS[1:])
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.executemany(f"""
+        INSERT INTO jobs ({", ".join(JOB_COLUMNS)}, fetched_at)
+        VALUES ({", ".join("?" * (len(JOB_COLUMNS) + 1))})
+        ON CONFLICT(job_id) DO UPDATE SET {updates}, fetched_at = excluded.fetched_at
+    """, rows)
+    conn.commit()
+    conn.close()
+
+def _fts_phrase(text):
+    # Quote every word so user input can't be parsed as FTS5 syntax.
+    return " ".join(f'"{w}"' for w in re.findall(r"\w+", text or ""))
+
+@timed("db.search_jobs")
+def search_jobs(keyword, location="", limit=20):
+    clauses = []
+    if _fts_phrase(keyword):
+        clauses.append(f"{{title company description}} : ({_fts_phrase(keyword)})")
+    if _fts_phrase(location):
+        clauses.append(f"location_text : ({_fts_phrase(location)})")
+
+    conn = get_conn()
+    cur = conn.cursor()
+    if clauses:
+        cur.execute("""
+            SELECT jobs.*
+            FROM jobs_fts
+            JOIN jobs ON jobs.rowid = jobs_fts.rowid
+            WHERE jobs_fts MATCH ?
+            ORDER BY bm25(jobs_fts)
+            LIMIT ?
+        """, (" AND ".join(clauses), limit))
+    else:
+        cur.execute("SELECT * FROM jobs ORDER BY fetched_at DESC LIMIT ?", (limit,))
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+@timed("db.get_job")
+def get_job(job_id):
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+    row = cur.fetchone()
+    conn.close()
+    return row
+
+@timed("db.create_generation_job")
+def create_generation_job(job_id, user_id, request, progress):
+    now = datetime.utcnow().isoformat()
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO generation_jobs (id, user_id, status, request, progress, created_at, updated_at)
+        VALUES (?, ?, 'queued', ?, ?, ?, ?)
+    """, (job_id, user_id, json.dumps(request), json.dumps(progress), now, now))
+    conn.commit()
+    conn.close()
+
+@timed("db.update_generation_job")
+def update_generation_job(job_id, status=None, progress=None, result=None, error=None):
+    fields = {"updated_at": datetime.utcnow().isoformat()}
+    if status is not None:
+        fields["status"] = status
+    if progress is not None:
+        fields["progress"] = json.dumps(progress)
+    if result is not None:
+        fields["result"] = json.dumps(result)
+    if error is not None:
+        fields["error"] = error
+
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        f"UPDATE generation_jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+        (*fields.values(), job_id)
+    )
+    conn.commit()
+    conn.close()
+
+@timed("db.get_generation_job")
+def get_generation_job(job_id, user_id=None):
+    conn = get_conn()
+    cur = conn.cursor()
+    if user_id is None:
+        cur.execute("SELECT * FROM generation_jobs WHERE id = ?", (job_id,))
+    else:
+        cur.execute("SELECT * FROM generation_jobs WHERE id = ? AND user_id = ?", (job_id, user_id))
+    row = cur.fetchone()
+    conn.close()
+    return row
+
+@timed("db.claim_generation_job")
+def claim_generation_job(job_id, owner, progress):
+    """Move a queued job to running for `owner`; False if another worker got it first."""
+    now = datetime.utcnow().isoformat()
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        UPDATE generation_jobs
+        SET status = 'running', owner = ?, heartbeat_at = ?, progress = ?, updated_at = ?
+        WHERE id = ? AND status = 'queued'
+    """, (owner, now, json.dumps(progress), now, job_id))
+    claimed = cur.rowcount == 1
+    conn.commit()
+    conn.close()
+    return claimed
+
+@timed("db.heartbeat_generation_jobs")
+def heartbeat_generation_jobs(owner):
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "UPDATE generation_jobs SET heartbeat_at = ? WHERE owner = ? AND status = 'running'",
+        (datetime.utcnow().isoformat(), owner)
+    )
+    conn.commit()
+    conn.close()
+
+@timed("db.requeue_stale_generation_jobs")
+def requeue_stale_generation_jobs(stale_before, progress):
+    """Re-queue running jobs whose worker has not heartbeated since stale_before; returns their ids."""
+    stale = """
+        status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(f"SELECT id FROM generation_jobs WHERE {stale}", (stale_before,))
+    requeued = []
+    for (job_id,) in cur.fetchall():
+        cur.execute(f"""
+            UPDATE generation_jobs
+            SET status = 'queued', owner = NULL, heartbeat_at = NULL, progress = ?, updated_at = ?
+            WHERE id = ? AND {stale}
+        """, (json.dumps(progress), datetime.utcnow().isoformat(), job_id, stale_before))
+        if cur.rowcount == 1:
+            requeued.append(job_id)
+    conn.commit()
+    conn.close()
+    return requeued
+
+@timed("db.get_unfinished_generation_jobs")
+def get_unfinished_generation_jobs():
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT id, status
+        FROM generation_jobs
+        WHERE status IN ('queued', 'running')
+        ORDER BY created_at
+    """)
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+@timed("db.create_bulk_batch")
+def create_bulk_batch(batch_id, user_id, request, jobs):
+    """jobs is a list of {"title", "description"} dicts, stored in order."""
+    now = datetime.utcnow().isoformat()
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO bulk_batches (id, user_id, status, request, total, created_at, updated_at)
+        VALUES (?, ?, 'queued', ?, ?, ?, ?)
+    """, (batch_id, user_id, json.dumps(request), len(jobs), now, now))
+    cur.executemany("""
+        INSERT INTO bulk_items (batch_id, position, job_title, job_description, status, updated_at)
+        VALUES (?, ?, ?, ?, 'pending', ?)
+    """, [(batch_id, i, j.get("title") or "", j["description"], now) for i, j in enumerate(jobs)])
+    conn.commit()
+    conn.close()
+
+@timed("db.get_bulk_batch")
+def get_bulk_batch(batch_id, user_id=None):
+    conn = get_conn()
+    cur = conn.cursor()
+    if user_id is None:
+        cur.execute("SELECT * FROM bulk_batches WHERE id = ?", (batch_id,))
+    else:
+        cur.execute("SELECT * FROM bulk_batches WHERE id = ? AND user_id = ?", (batch_id, user_id))
+    row = cur.fetchone()
     conn.close()
     return row
+
+@timed("db.update_bulk_batch")
+def update_bulk_batch(batch_id, status):
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "UPDATE bulk_batches SET status = ?, updated_at = ? WHERE id = ?",
+        (status, datetime.utcnow().isoformat(), batch_id)
+    )
+    conn.commit()
+    conn.close()
+
+@timed("db.get_bulk_items")
+def get_bulk_items(batch_id, with_results=True):
+    columns = "*" if with_results else "batch_id, position, job_title, status, error, attempts, updated_at"
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(f"SELECT {columns} FROM bulk_items WHERE batch_id = ? ORDER BY position", (batch_id,))
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+@timed("db.claim_bulk_item")
+def claim_bulk_item(batch_id, position, owner, stale_before):
+    """Mark an unfinished item running for `owner`, unless a run that has
+    heartbeated since stale_before holds it. Returns whether it was claimed."""
+    now = datetime.utcnow().isoformat()
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        UPDATE bulk_items
+        SET status = 'running', owner = ?, heartbeat_at = ?, error = NULL,
+            attempts = attempts + 1, updated_at = ?
+        WHERE batch_id = ? AND position = ? AND status != 'done'
+          AND (status != 'running' OR heartbeat_at IS NULL OR heartbeat_at < ?)
+    """, (owner, now, now, batch_id, position, stale_before))
+    claimed = cur.rowcount == 1
+    conn.commit()
+    conn.close()
+    return claimed
+
+@timed("db.heartbeat_bulk_items")
+def heartbeat_bulk_items(owner):
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "UPDATE bulk_items SET heartbeat_at = ? WHERE owner = ? AND status = 'running'",
+        (datetime.utcnow().isoformat(), owner)
+    )
+    conn.commit()
+    conn.close()
+
+@timed("db.update_bulk_item")
+def update_bulk_item(batch_id, position, status, result=None, error=None):
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        UPDATE bulk_items
+        SET status = ?, result = ?, error = ?, updated_at = ?
+        WHERE batch_id = ? AND position = ?
+    """, (
+        status, json.dumps(result) if result is not None else None, error,
+        datetime.utcnow().isoformat(), batch_id, position
+    ))
+    conn.commit()
+    conn.close()
+
+if __name__ == "__main__":
+    # Apply pending migrations, reclaim freed pages and show what blob storage saves.
+    init_db()
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("VACUUM")
+    conn.close()
+    print(json.dumps(history_storage_report(), indent=2))
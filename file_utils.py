@@ -1,11 +1,17 @@
 import os
 import re
+from io import BytesIO
 from docx import Document
+from docx.shared import Pt
 from fpdf import FPDF
 from pypdf import PdfReader
 
 OUTPUT_DIR = "outputs"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+TEMPLATES = {
+    "default": {"font": "Helvetica", "size": 11, "line_height": 6, "gap": 5},
+    "compact": {"font": "Helvetica", "size": 10, "line_height": 5, "gap": 3},
+}
 
 def read_docx(file) -> str:
     doc = Document(file)
@@ -13,18 +19,23 @@ def read_docx(file) -> str:
 
 def read_pdf(file) -> str:
     reader = PdfReader(file)
-    text = ""
-    for page in reader.pages:
-        page_text = page.extract_text() or ""
-        text += page_text + "\n"
-    return text.strip()
+    return "\n".join(page.extract_text() or "" for page in reader.pages).strip()
 
-def save_docx(text: str, filename: str) -> str:
-    path = os.path.join(OUTPUT_DIR, filename)
+def render_docx(text: str, template: str = "default") -> bytes:
+    style = TEMPLATES[template]
     doc = Document()
+    doc.styles["Normal"].font.size = Pt(style["size"])
     for line in text.split("\n"):
         doc.add_paragraph(line)
-    doc.save(path)
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+def save_docx(text: str, filename: str) -> str:
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(OUTPUT_DIR, filename)
+    with open(path, "wb") as f:
+        f.write(render_docx(text))
     return path
 
 def _wrap_long_tokens(text: str, max_len: int = 60) -> str:
@@ -36,13 +47,13 @@ def _wrap_long_tokens(text: str, max_len: int = 60) -> str:
     parts = [break_token(p) for p in parts]
     return " ".join(parts)
 
-def save_pdf(text: str, filename: str) -> str:
-    path = os.path.join(OUTPUT_DIR, filename)
+def render_pdf(text: str, template: str = "default") -> bytes:
+    style = TEMPLATES[template]
 
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=12)
     pdf.add_page()
-    pdf.set_font("Helvetica", size=11)
+    pdf.set_font(style["font"], size=style["size"])
 
     text = text.replace("\t", "    ")
     text = re.sub(r"[^\x00-\x7F]+", " ", text)
@@ -50,9 +61,15 @@ def save_pdf(text: str, filename: str) -> str:
 
     for line in text.split("\n"):
         if not line.strip():
-            pdf.ln(5)
+            pdf.ln(style["gap"])
         else:
-            pdf.multi_cell(0, 6, line)
+            pdf.multi_cell(0, style["line_height"], line, new_x="LMARGIN", new_y="NEXT")
+
+    return bytes(pdf.output())
 
-    pdf.output(path)
+def save_pdf(text: str, filename: str) -> str:
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(OUTPUT_DIR, filename)
+    with open(path, "wb") as f:
+        f.write(render_pdf(text))
     return path
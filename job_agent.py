@@ -1,20 +1,30 @@
+import json
 import os
 import requests
 from dotenv import load_dotenv
-from functools import lru_cache
+
+from db import upsert_jobs
+from job_cache import job_cache
+from metrics import timed
 
 load_dotenv()
 
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
 RAPIDAPI_HOST = "jsearch.p.rapidapi.com"
+JSEARCH_URL = os.getenv("JSEARCH_URL", f"https://{RAPIDAPI_HOST}/search")
 
 
-@lru_cache(maxsize=50)
+@timed("jobs.fetch")
 def fetch_jobs(keyword: str, location: str = "India", page: int = 1):
+    key = json.dumps([keyword.strip().lower(), location.strip().lower(), page])
+    return job_cache.get_or_fetch(key, lambda: _fetch_jobs_upstream(keyword, location, page))
+
+
+@timed("jobs.upstream")
+def _fetch_jobs_upstream(keyword: str, location: str, page: int):
     if not RAPIDAPI_KEY:
         raise RuntimeError("RAPIDAPI_KEY missing. Add it in .env")
 
-    url = "https://jsearch.p.rapidapi.com/search"
     params = {
         "query": f"{keyword} in {location}",
         "page": str(page),
@@ -27,7 +37,7 @@ def fetch_jobs(keyword: str, location: str = "India", page: int = 1):
         "X-RapidAPI-Host": RAPIDAPI_HOST
     }
 
-    r = requests.get(url, headers=headers, params=params, timeout=60)
+    r = requests.get(JSEARCH_URL, headers=headers, params=params, timeout=60)
 
     # ✅ Debug prints
     print("STATUS:", r.status_code)
@@ -38,6 +48,7 @@ def fetch_jobs(keyword: str, location: str = "India", page: int = 1):
     jobs = r.json().get("data", [])
     results = []
     for j in jobs:
+        description = j.get("job_description") or ""
         results.append({
             "job_id": j.get("job_id"),
             "title": j.get("job_title"),
@@ -46,7 +57,20 @@ def fetch_jobs(keyword: str, location: str = "India", page: int = 1):
             "employment_type": j.get("job_employment_type"),
             "apply_link": j.get("job_apply_link"),
             "publisher": j.get("job_publisher"),
-            "snippet": (j.get("job_description") or "")[:700],
+            "snippet": description[:700],
+            "description": description,
         })
 
+    # Keep every posting for /jobs/local-search; the searched location is
+    # indexed too since JSearch often reports only a city or country code.
+    upsert_jobs([
+        {
+            **r,
+            "location_text": " ".join(filter(None, [
+                j.get("job_city"), j.get("job_state"), j.get("job_country"), location
+            ])),
+        }
+        for r, j in zip(results, jobs)
+    ])
+
     return results
@@ -0,0 +1,219 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from db import DATA_DIR
+
+JOB_CACHE_PATH = os.path.join(DATA_DIR, "job_cache.db")
+# Fresh for JOB_CACHE_TTL; after that served as stale (with a background
+# refresh) for another JOB_CACHE_STALE_TTL, then treated as a miss.
+JOB_CACHE_TTL = int(os.getenv("JOB_CACHE_TTL", "3600"))
+JOB_CACHE_STALE_TTL = int(os.getenv("JOB_CACHE_STALE_TTL", str(6 * 3600)))
+# How long one process may hold the upstream fetch for a key.
+JOB_CACHE_LEASE_SECONDS = 90
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SharedTTLCache:
+    """Disk-backed cache shared by all workers, with stale-while-revalidate.
+
+    Concurrent misses for one key make a single upstream call: threads in a
+    process wait on an in-memory flight, other processes on a lease row.
+    """
+
+    def __init__(self, path=JOB_CACHE_PATH, ttl=JOB_CACHE_TTL, stale_ttl=JOB_CACHE_STALE_TTL,
+                 lease_seconds=JOB_CACHE_LEASE_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lease_seconds = lease_seconds
+        self.owner = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._refreshing = set()
+        self.metrics = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+            "upstream_fetches": 0, "refreshes": 0, "refresh_errors": 0,
+        }
+        self._init()
+
+    def _conn(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init(self):
+        conn = self._conn()
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )
+        """)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS leases (
+            key TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """)
+        conn.close()
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.metrics[name] += n
+
+    def _read(self, key):
+        conn = self._conn()
+        try:
+            row = conn.execute("SELECT value, fetched_at FROM entries WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def _write(self, key, value):
+        conn = self._conn()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+        finally:
+            conn.close()
+
+    def _acquire_lease(self, key) -> bool:
+        now = time.time()
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires_at < ?", (key, now))
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self.owner, now + self.lease_seconds)
+            )
+            conn.execute("COMMIT")
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def _release_lease(self, key):
+        conn = self._conn()
+        try:
+            conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+        finally:
+            conn.close()
+
+    def get_or_fetch(self, key: str, fetch):
+        entry = self._read(key)
+        if entry:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                self._count("hits")
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale_hits")
+                self._refresh_async(key, fetch)
+                return value
+
+        self._count("misses")
+        return self._fetch_once(key, fetch)
+
+    def _fetch_once(self, key, fetch):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            self._count("coalesced")
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._fetch_across_processes(key, fetch)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _fetch_across_processes(self, key, fetch):
+        started = time.time()
+        while not self._acquire_lease(key):
+            # Another worker is fetching this key; use its result once written.
+            time.sleep(0.2)
+            entry = self._read(key)
+            if entry and entry[1] >= started:
+                self._count("coalesced")
+                return entry[0]
+            if time.time() - started > self.lease_seconds:
+                break
+
+        try:
+            value = fetch()
+            self._count("upstream_fetches")
+            self._write(key, value)
+            return value
+        finally:
+            self._release_lease(key)
+
+    def _refresh_async(self, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                if self._acquire_lease(key):
+                    try:
+                        value = fetch()
+                        self._count("upstream_fetches")
+                        self._write(key, value)
+                        self._count("refreshes")
+                    finally:
+                        self._release_lease(key)
+            except Exception:
+                self._count("refresh_errors")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        try:
+            entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        finally:
+            conn.close()
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["stale_hits"] + self.metrics["misses"]
+            served = self.metrics["hits"] + self.metrics["stale_hits"]
+            return {
+                **self.metrics,
+                "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+                "entries": entries,
+                "ttl_seconds": self.ttl,
+                "stale_ttl_seconds": self.stale_ttl,
+            }
+
+
+job_cache = SharedTTLCache()
@@ -0,0 +1,104 @@
+import json
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from db import (
+    create_generation_job, update_generation_job, get_generation_job,
+    get_unfinished_generation_jobs, claim_generation_job,
+    heartbeat_generation_jobs, requeue_stale_generation_jobs
+)
+
+GEN_WORKERS = int(os.getenv("GEN_WORKERS", "2"))
+# Running jobs are heartbeated by their process; a job whose heartbeat is
+# older than GEN_STALE_SECONDS belonged to a process that died and is re-queued.
+GEN_HEARTBEAT_SECONDS = int(os.getenv("GEN_HEARTBEAT_SECONDS", "15"))
+GEN_STALE_SECONDS = int(os.getenv("GEN_STALE_SECONDS", "120"))
+
+
+class GenerationQueue:
+    """Background workers for submitted /generate jobs, persisted in SQLite.
+
+    runner(user_id, request, on_event) runs one job and returns its result;
+    on_event(kind, stage, payload) matches pipeline.run_stages.
+    """
+
+    def __init__(self, runner, stages, workers=GEN_WORKERS):
+        self.runner = runner
+        self.stages = list(stages)
+        self.workers = max(1, workers)
+        # Several uvicorn workers share the table; each claims jobs as itself.
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue = queue.Queue()
+        self._threads = []
+
+    def start(self):
+        # Jobs left running by a process that died start over. Every process
+        # queues the queued rows; claiming decides which one runs each.
+        self._requeue_stale()
+        for row in get_unfinished_generation_jobs():
+            if row["status"] == "queued":
+                self._queue.put(row["id"])
+
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"generation-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat, name="generation-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def _requeue_stale(self):
+        stale_before = (datetime.utcnow() - timedelta(seconds=GEN_STALE_SECONDS)).isoformat()
+        return requeue_stale_generation_jobs(stale_before, self._initial_progress())
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(GEN_HEARTBEAT_SECONDS)
+            try:
+                heartbeat_generation_jobs(self.owner)
+                for job_id in self._requeue_stale():
+                    self._queue.put(job_id)
+            except sqlite3.OperationalError:
+                # Locked database; try again on the next beat.
+                continue
+
+    def _initial_progress(self):
+        return {name: "pending" for name in self.stages}
+
+    def submit(self, user_id, request: dict) -> str:
+        job_id = uuid.uuid4().hex
+        create_generation_job(job_id, user_id, request, self._initial_progress())
+        self._queue.put(job_id)
+        return job_id
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id):
+        progress = self._initial_progress()
+        if not claim_generation_job(job_id, self.owner, progress):
+            # Already taken by another worker, or no longer queued.
+            return
+        row = get_generation_job(job_id)
+
+        def on_event(kind, stage, payload):
+            progress[stage] = {"start": "running", "done": "done", "error": "failed"}[kind]
+            update_generation_job(job_id, progress=progress)
+
+        try:
+            result = self.runner(row["user_id"], json.loads(row["request"]), on_event)
+            update_generation_job(job_id, status="done", progress=progress, result=result)
+        except Exception as e:
+            error = getattr(e, "detail", None) or str(e) or e.__class__.__name__
+            update_generation_job(job_id, status="failed", progress=progress, error=str(error))
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from db import DATA_DIR
+
+CACHE_PATH = os.path.join(DATA_DIR, "llm_cache.db")
+CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+class LLMCache:
+    """Completions keyed by (model, prompt hash, options), LRU-evicted by size."""
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES, ttl_seconds=CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._init()
+
+    def _conn(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init(self):
+        conn = self._conn()
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS completions (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_last_access ON completions(last_access)")
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, options: dict | None = None) -> str:
+        raw = json.dumps({
+            "model": model,
+            "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+            "options": options or {},
+        }, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, model: str, prompt: str, options: dict | None = None) -> str | None:
+        key = self.make_key(model, prompt, options)
+        now = time.time()
+        conn = self._conn()
+        try:
+            row = conn.execute(
+                "SELECT response, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+            if row:
+                conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+        finally:
+            conn.close()
+
+        self._count(row is not None)
+        return row[0] if row else None
+
+    def put(self, model: str, prompt: str, response: str, options: dict | None = None):
+        if not response:
+            return
+        key = self.make_key(model, prompt, options)
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        conn = self._conn()
+        try:
+            conn.execute("""
+                INSERT OR REPLACE INTO completions (key, model, response, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (key, model, response, size, now, now))
+            self._evict(conn, now)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _evict(self, conn, now):
+        expired = conn.execute(
+            "DELETE FROM completions WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            rows = conn.execute(
+                "SELECT key, size FROM completions ORDER BY last_access ASC"
+            ).fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+
+        with self._lock:
+            self.evictions += expired + evicted
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        try:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+        finally:
+            conn.close()
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+llm_cache = LLMCache()
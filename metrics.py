@@ -0,0 +1,162 @@
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt(value):
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._render_value(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{_label_str(self.labels, key)} {_fmt(value)}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{_label_str(self.labels, key)} {_fmt(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_value(self, key, value):
+        counts, total, n = value
+        lines = [
+            f"{self.name}_bucket{_label_str(self.labels, key, [('le', _fmt(b))])} {c}"
+            for b, c in zip(self.buckets, counts)
+        ]
+        lines.append(f"{self.name}_bucket{_label_str(self.labels, key, [('le', '+Inf')])} {n}")
+        lines.append(f"{self.name}_sum{_label_str(self.labels, key)} {_fmt(total)}")
+        lines.append(f"{self.name}_count{_label_str(self.labels, key)} {n}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds", "Time spent in one stage of request handling",
+    labels=("stage", "model"),
+)
+
+# Per-request list of (stage, seconds), set by the Server-Timing middleware.
+# Threads started with contextvars.copy_context() share the same list.
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> list:
+    timings = []
+    _request_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def stage_timer(stage: str, model: str = ""):
+    """Record the block's duration under `stage` and in the current request's timings."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        STAGE_SECONDS.observe(elapsed, stage=stage, model=model)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+def timed(stage: str):
+    """Decorator form of stage_timer for functions without a model."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def server_timing_header(timings) -> str:
+    """Server-Timing value with repeated stages summed, e.g. db.get_job;dur=1.2;desc="x2"."""
+    totals = {}
+    for stage, seconds in timings:
+        total, count = totals.get(stage, (0.0, 0))
+        totals[stage] = (total + seconds, count + 1)
+    parts = []
+    for stage, (total, count) in totals.items():
+        part = f"{stage};dur={total * 1000:.1f}"
+        if count > 1:
+            part += f';desc="x{count}"'
+        parts.append(part)
+    return ", ".join(parts)
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,32 @@
+import os
+
+
+class ConfigError(Exception):
+    pass
+
+
+def parse_model_map(env: str, cast=str, defaults=None) -> dict:
+    """{model: value} from an env var like "llama3=2,mistral=4", over defaults."""
+    mapping = dict(defaults or {})
+    for item in os.getenv(env, "").split(","):
+        if not item.strip():
+            continue
+        name, sep, value = (part.strip() for part in item.partition("="))
+        if not sep or not name or not value:
+            raise ConfigError(f"{env}: expected comma-separated model=value pairs, got '{item.strip()}'")
+        try:
+            mapping[name] = cast(value)
+        except ValueError:
+            raise ConfigError(f"{env}: '{value}' for model '{name}' is not a valid {cast.__name__}")
+    return mapping
+
+
+# Models clients may ask for. Anything else is rejected before it gets an
+# Ollama slot or becomes a metrics label.
+MODELS = [m.strip() for m in os.getenv("MODELS", "llama3,mistral,gemma").split(",") if m.strip()]
+
+
+def check_model(model: str) -> str:
+    if model not in MODELS:
+        raise ValueError(f"Unknown model '{model}', available: {', '.join(MODELS)}")
+    return model
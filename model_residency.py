@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+
+from compaction import ollama_options
+from metrics import Counter, Gauge, Histogram
+from model_config import parse_model_map
+from ollama_client import OllamaError, ollama
+
+# Models loaded on every endpoint at startup, e.g. "llama3,mistral".
+PRELOAD_MODELS = [m.strip() for m in os.getenv("PRELOAD_MODELS", "llama3").split(",") if m.strip()]
+# Ollama keep_alive per model ("30m", "3600", "-1" = never unload).
+DEFAULT_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+MODEL_KEEP_ALIVE = parse_model_map("MODEL_KEEP_ALIVE", str, {
+    "llama3": "60m",
+    "mistral": DEFAULT_KEEP_ALIVE,
+    "gemma": DEFAULT_KEEP_ALIVE,
+})
+RESIDENCY_POLL_SECONDS = int(os.getenv("RESIDENCY_POLL_SECONDS", "30"))
+# A generation whose load_duration exceeds this paid for loading the model.
+COLD_LOAD_SECONDS = float(os.getenv("COLD_LOAD_SECONDS", "0.3"))
+
+GENERATIONS = Counter("ollama_generations_total", "Finished generations", labels=("model",))
+COLD_STARTS = Counter(
+    "ollama_cold_starts_total", "Generations that had to load the model first", labels=("model",),
+)
+COLD_LOAD_SECONDS_HIST = Histogram(
+    "ollama_cold_load_seconds", "Model load time paid by cold generations", labels=("model",),
+)
+PRELOAD_SECONDS = Histogram("ollama_preload_seconds", "Time to preload a model", labels=("model",))
+RESIDENT = Gauge("ollama_model_resident", "1 if the model is loaded on the endpoint", labels=("model", "endpoint"))
+
+
+def _base_name(name: str) -> str:
+    return name[:-len(":latest")] if name.endswith(":latest") else name
+
+
+class ResidencyManager:
+    """Keeps configured models loaded and tracks which endpoint has which model.
+
+    Residency comes from Ollama's /api/ps, polled in the background and
+    updated after every generation.
+    """
+
+    def __init__(self, client=ollama, preload=PRELOAD_MODELS, poll_seconds=RESIDENCY_POLL_SECONDS):
+        self.client = client
+        self.preload_models = list(preload)
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._resident = {u: {} for u in client.urls}  # url -> {model: expires_at str}
+        self._last_load = {}
+        self.last_error = None
+        self._thread = None
+
+    def keep_alive(self, model: str) -> str:
+        return MODEL_KEEP_ALIVE.get(model, DEFAULT_KEEP_ALIVE)
+
+    def start(self):
+        self.client.route_hint = self.resident_urls
+        self.client.add_listener(self.observe)
+        self._thread = threading.Thread(target=self._run, name="model-residency", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        self.preload()
+        while True:
+            time.sleep(self.poll_seconds)
+            self.refresh()
+
+    def preload(self, models=None):
+        # An empty prompt makes Ollama load the model and return immediately.
+        # It is loaded with the same num_ctx as real requests, or the first
+        # of those would reload it.
+        for model in models or self.preload_models:
+            for url in self.client.urls:
+                t0 = time.perf_counter()
+                try:
+                    self.client.post_to(url, "/api/generate", {
+                        "model": model, "keep_alive": self.keep_alive(model), "stream": False,
+                        "options": ollama_options(model),
+                    })
+                except OllamaError as e:
+                    self.last_error = f"preload {model} on {url}: {e}"
+                    continue
+                PRELOAD_SECONDS.observe(time.perf_counter() - t0, model=model)
+                self._mark(url, model, True)
+        self.refresh()
+
+    def refresh(self):
+        for url in self.client.urls:
+            try:
+                models = self.client.get_json(url, "/api/ps").get("models", [])
+            except (OllamaError, ValueError) as e:
+                self.last_error = f"/api/ps on {url}: {e}"
+                continue
+            loaded = {_base_name(m.get("name") or m.get("model", "")): m.get("expires_at") for m in models}
+            with self._lock:
+                gone = set(self._resident[url]) - set(loaded)
+                self._resident[url] = loaded
+            for model in gone:
+                RESIDENT.set(0, model=model, endpoint=url)
+            for model in loaded:
+                RESIDENT.set(1, model=model, endpoint=url)
+
+    def _mark(self, url, model, resident):
+        with self._lock:
+            if resident:
+                self._resident[url].setdefault(model, None)
+            else:
+                self._resident[url].pop(model, None)
+        RESIDENT.set(1 if resident else 0, model=model, endpoint=url)
+
+    def observe(self, url, model, data):
+        """Listener for finished generations: count cold starts and mark the model loaded."""
+        GENERATIONS.inc(model=model)
+        load_s = (data.get("load_duration") or 0) / 1e9
+        if load_s > COLD_LOAD_SECONDS:
+            COLD_STARTS.inc(model=model)
+            COLD_LOAD_SECONDS_HIST.observe(load_s, model=model)
+            with self._lock:
+                self._last_load[model] = round(load_s, 3)
+        self._mark(url, model, True)
+
+    def resident_urls(self, model: str) -> list:
+        with self._lock:
+            return [u for u, models in self._resident.items() if model in models]
+
+    def is_resident(self, model: str) -> bool:
+        return bool(self.resident_urls(model))
+
+    def cold_warning(self, model: str):
+        if self.is_resident(model):
+            return None
+        return f"Model '{model}' is not loaded yet; the first response will include its load time"
+
+    def status(self) -> dict:
+        with self._lock:
+            resident = {u: dict(m) for u, m in self._resident.items()}
+            last_load = dict(self._last_load)
+        models = sorted(set(self.preload_models) | set(MODEL_KEEP_ALIVE)
+                        | {m for loaded in resident.values() for m in loaded})
+        return {
+            "models": [
+                {
+                    "model": m,
+                    "resident_on": [u for u, loaded in resident.items() if m in loaded],
+                    "expires_at": next((loaded[m] for loaded in resident.values() if loaded.get(m)), None),
+                    "keep_alive": self.keep_alive(m),
+                    "preload": m in self.preload_models,
+                    "last_cold_load_seconds": last_load.get(m),
+                }
+                for m in models
+            ],
+            "last_error": self.last_error,
+        }
+
+
+residency = ResidencyManager()
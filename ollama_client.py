@@ -0,0 +1,217 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import Counter, Gauge, Histogram
+
+# Comma-separated list of Ollama servers, e.g. "http://gpu1:11434,http://gpu2:11434"
+OLLAMA_URLS = [
+    u.strip().rstrip("/")
+    for u in os.getenv("OLLAMA_URLS", "http://localhost:11434").split(",")
+    if u.strip()
+]
+# Concurrent calls per model on each endpoint; extra callers wait in a bounded queue.
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))
+OLLAMA_MAX_QUEUE = int(os.getenv("OLLAMA_MAX_QUEUE", "16"))
+OLLAMA_QUEUE_TIMEOUT = float(os.getenv("OLLAMA_QUEUE_TIMEOUT", "120"))
+OLLAMA_RETRY_AFTER = int(os.getenv("OLLAMA_RETRY_AFTER", "10"))
+OLLAMA_TIMEOUT = 300
+
+EVAL_TOKENS = Counter("ollama_eval_tokens_total", "Tokens generated by Ollama", labels=("model", "stage"))
+PROMPT_TOKENS = Counter("ollama_prompt_tokens_total", "Prompt tokens evaluated by Ollama", labels=("model", "stage"))
+TOKENS_PER_SECOND = Histogram(
+    "ollama_tokens_per_second", "Decode rate reported by Ollama (eval_count / eval_duration)",
+    labels=("model", "stage"), buckets=(1, 2, 5, 10, 15, 20, 30, 40, 60, 80, 100, 150, 200, 400),
+)
+PROMPT_EVAL_SECONDS = Histogram(
+    "ollama_prompt_eval_seconds", "Prompt evaluation time reported by Ollama", labels=("model", "stage"),
+)
+LOAD_SECONDS = Histogram("ollama_load_seconds", "Model load time reported by Ollama", labels=("model",))
+LAST_TOKENS_PER_SECOND = Gauge(
+    "ollama_last_tokens_per_second", "Decode rate of the most recent generation", labels=("model",),
+)
+
+
+class OllamaBusy(Exception):
+    def __init__(self, model: str, retry_after: int = OLLAMA_RETRY_AFTER):
+        super().__init__(f"Model '{model}' is busy, retry in {retry_after}s")
+        self.model = model
+        self.retry_after = retry_after
+
+
+class OllamaError(Exception):
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        # HTTP status of Ollama's reply; None when it could not be reached.
+        self.status_code = status_code
+
+
+def observe_generation(data: dict, model: str, stage: str = ""):
+    """Record the timing fields of a final /api/generate response (durations are ns)."""
+    eval_count = data.get("eval_count") or 0
+    eval_ns = data.get("eval_duration") or 0
+    EVAL_TOKENS.inc(eval_count, model=model, stage=stage)
+    PROMPT_TOKENS.inc(data.get("prompt_eval_count") or 0, model=model, stage=stage)
+    if data.get("prompt_eval_duration"):
+        PROMPT_EVAL_SECONDS.observe(data["prompt_eval_duration"] / 1e9, model=model, stage=stage)
+    if data.get("load_duration"):
+        LOAD_SECONDS.observe(data["load_duration"] / 1e9, model=model)
+    if eval_count and eval_ns:
+        rate = eval_count / (eval_ns / 1e9)
+        TOKENS_PER_SECOND.observe(rate, model=model, stage=stage)
+        LAST_TOKENS_PER_SECOND.set(rate, model=model)
+
+
+class OllamaClient:
+    """Shared, bounded access to one or more Ollama servers."""
+
+    def __init__(self, urls=None, max_concurrency=OLLAMA_MAX_CONCURRENCY,
+                 max_queue=OLLAMA_MAX_QUEUE, queue_timeout=OLLAMA_QUEUE_TIMEOUT):
+        self.urls = list(urls or OLLAMA_URLS)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=len(self.urls),
+            pool_maxsize=max_concurrency * 4,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._in_flight = {u: 0 for u in self.urls}
+        self._slots = {}
+        self._waiting = {}
+        self.rejected = 0
+        # route_hint(model) -> endpoints that already have the model loaded.
+        self.route_hint = None
+        self._listeners = []
+
+    def add_listener(self, fn):
+        """fn(url, model, data) is called with each finished generation's final response."""
+        self._listeners.append(fn)
+
+    def _notify(self, url, model, data):
+        for fn in self._listeners:
+            fn(url, model, data)
+
+    def _slot(self, model: str) -> threading.Semaphore:
+        with self._lock:
+            if model not in self._slots:
+                self._slots[model] = threading.Semaphore(self.max_concurrency * len(self.urls))
+                self._waiting[model] = 0
+            return self._slots[model]
+
+    def _admit(self, model: str):
+        sem = self._slot(model)
+        if sem.acquire(blocking=False):
+            return sem
+
+        with self._lock:
+            if self._waiting[model] >= self.max_queue:
+                self.rejected += 1
+                raise OllamaBusy(model)
+            self._waiting[model] += 1
+        try:
+            acquired = sem.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting[model] -= 1
+
+        if not acquired:
+            with self._lock:
+                self.rejected += 1
+            raise OllamaBusy(model)
+        return sem
+
+    @contextmanager
+    def endpoint(self, model: str):
+        """Hold a model slot and yield an endpoint URL.
+
+        Endpoints with the model already loaded are preferred while they have
+        free capacity; otherwise the least-loaded endpoint is used.
+        """
+        sem = self._admit(model)
+        warm = set(self.route_hint(model)) if self.route_hint else set()
+        with self._lock:
+            candidates = [
+                u for u in self.urls if u in warm and self._in_flight[u] < self.max_concurrency
+            ] or self.urls
+            url = min(candidates, key=lambda u: self._in_flight[u])
+            self._in_flight[url] += 1
+        try:
+            yield url
+        finally:
+            with self._lock:
+                self._in_flight[url] -= 1
+            sem.release()
+
+    def _post(self, url: str, path: str, payload: dict, stream: bool = False):
+        try:
+            r = self.session.post(f"{url}{path}", json=payload, stream=stream, timeout=OLLAMA_TIMEOUT)
+        except requests.RequestException as e:
+            raise OllamaError(f"{url} unreachable: {e}")
+        if r.status_code != 200:
+            text = r.text
+            r.close()
+            raise OllamaError(text, status_code=r.status_code)
+        return r
+
+    def post_json(self, path: str, payload: dict) -> dict:
+        with self.endpoint(payload.get("model", "")) as url:
+            return self._post(url, path, payload).json()
+
+    def post_to(self, url: str, path: str, payload: dict) -> dict:
+        """POST to one specific endpoint, outside the per-model slots (for housekeeping)."""
+        return self._post(url, path, payload).json()
+
+    def get_json(self, url: str, path: str) -> dict:
+        try:
+            r = self.session.get(f"{url}{path}", timeout=10)
+        except requests.RequestException as e:
+            raise OllamaError(f"{url} unreachable: {e}")
+        if r.status_code != 200:
+            raise OllamaError(r.text, status_code=r.status_code)
+        return r.json()
+
+    def generate(self, payload: dict) -> dict:
+        model = payload.get("model", "")
+        with self.endpoint(model) as url:
+            data = self._post(url, "/api/generate", {**payload, "stream": False}).json()
+        self._notify(url, model, data)
+        return data
+
+    def stream(self, payload: dict):
+        """Yield Ollama's streamed chunks; the model slot is held until the stream ends."""
+        with self.endpoint(payload.get("model", "")) as url:
+            with self._post(url, "/api/generate", {**payload, "stream": True}, stream=True) as r:
+                for line in r.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise OllamaError(chunk["error"])
+                    if chunk.get("done"):
+                        self._notify(url, payload.get("model", ""), chunk)
+                    # No break on "done": Ollama ends the body right after it,
+                    # and reading to the end keeps the connection reusable.
+                    yield chunk
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "endpoints": dict(self._in_flight),
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "waiting": dict(self._waiting),
+                "rejected": self.rejected,
+            }
+
+
+ollama = OllamaClient()
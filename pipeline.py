@@ -0,0 +1,99 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from model_config import parse_model_map
+
+# How many stages of one request may run at the same time for a given model.
+# Ollama serves parallel requests per model (OLLAMA_NUM_PARALLEL), so a small
+# fan-out is enough to overlap the follow-up stages.
+DEFAULT_STAGE_PARALLELISM = int(os.getenv("STAGE_PARALLELISM", "3"))
+# Per-model overrides, e.g. MODEL_STAGE_PARALLELISM="llama3=2,mistral=4".
+MODEL_STAGE_PARALLELISM = parse_model_map("MODEL_STAGE_PARALLELISM", int)
+
+
+class Stage:
+    def __init__(self, name, fn, deps=(), critical=False):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        # A failing critical stage aborts the run and re-raises its exception.
+        self.critical = critical
+
+
+def stage_parallelism(model: str) -> int:
+    return max(1, MODEL_STAGE_PARALLELISM.get(model, DEFAULT_STAGE_PARALLELISM))
+
+
+def run_stages(stages, model: str = "llama3", on_event=None):
+    """Run stages as soon as their dependencies are done.
+
+    Each stage fn receives a dict of its dependencies' results. Returns
+    (results, errors); a failed stage does not stop independent branches,
+    stages depending on it are skipped with an error instead. A failed
+    critical stage re-raises its exception.
+    """
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        for d in s.deps:
+            if d not in by_name:
+                raise ValueError(f"Stage '{s.name}' depends on unknown stage '{d}'")
+
+    results = {}
+    errors = {}
+    pending = list(stages)
+    running = {}
+    lock = threading.Lock()
+
+    def emit(kind, name, payload=None):
+        if on_event is None:
+            return
+        with lock:
+            on_event(kind, name, payload)
+
+    def call(stage):
+        emit("start", stage.name)
+        return stage.fn({d: results[d] for d in stage.deps})
+
+    with ThreadPoolExecutor(max_workers=stage_parallelism(model)) as pool:
+        while pending or running:
+            skipped = True
+            while skipped:
+                skipped = False
+                for s in list(pending):
+                    failed = [d for d in s.deps if d in errors]
+                    if failed:
+                        pending.remove(s)
+                        errors[s.name] = f"Skipped: stage '{failed[0]}' failed"
+                        emit("error", s.name, errors[s.name])
+                        skipped = True
+
+            ready = [s for s in pending if all(d in results for d in s.deps)]
+            for s in ready:
+                pending.remove(s)
+
+            for s in ready:
+                # Stage threads see the caller's context (e.g. request timings).
+                running[pool.submit(contextvars.copy_context().run, call, s)] = s
+
+            if not running:
+                # Only stages caught in a dependency cycle can be left here.
+                for s in pending:
+                    errors[s.name] = "Skipped: unresolved stage dependencies"
+                    emit("error", s.name, errors[s.name])
+                break
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                s = running.pop(fut)
+                try:
+                    results[s.name] = fut.result()
+                    emit("done", s.name, results[s.name])
+                except Exception as e:
+                    errors[s.name] = getattr(e, "detail", None) or str(e) or e.__class__.__name__
+                    emit("error", s.name, errors[s.name])
+                    if s.critical:
+                        raise
+
+    return results, errors
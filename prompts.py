@@ -74,3 +74,30 @@ RULES:
 ATS RESUME:
 {resume}
 """
+
+SINGLE_PASS_PROMPT = """
+You are an expert ATS resume writer, career writer and technical recruiter.
+
+TASK:
+Using the resume and job description, produce all of the following at once:
+1) ats_resume: the resume rewritten to match the job description
+   - ATS-friendly formatting, no tables, icons or images
+   - Strong action verbs + metrics
+   - Clean headings: Summary, Skills, Experience, Projects, Education
+   - Do not hallucinate fake experiences
+2) cover_letter: a formal 250-350 word, 3 paragraph cover letter that mentions
+   relevant skills + projects from the rewritten resume
+3) missing_skills: missing/weak skills, suggested keywords and best projects
+   to add, each as bullets under those three headings
+4) linkedin_summary: a 120-200 word recruiter-friendly LinkedIn About section
+   covering domain, skills, achievements and career goal, no emojis
+
+INPUT RESUME:
+{resume}
+
+JOB DESCRIPTION:
+{job}
+
+Return ONLY a JSON object with exactly these string fields:
+{{"ats_resume": "...", "cover_letter": "...", "missing_skills": "...", "linkedin_summary": "..."}}
+"""
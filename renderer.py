@@ -0,0 +1,79 @@
+import hashlib
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from io import BytesIO
+
+from file_utils import TEMPLATES, render_docx, render_pdf
+
+RENDER_CACHE_BYTES = int(os.getenv("RENDER_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+RENDERERS = {"pdf": render_pdf, "docx": render_docx}
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "zip": "application/zip",
+}
+
+
+class RenderCache:
+    """Rendered documents keyed by (text hash, format, template), LRU by total bytes."""
+
+    def __init__(self, max_bytes=RENDER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, text: str, fmt: str, template: str = "default") -> bytes:
+        if fmt not in RENDERERS:
+            raise ValueError(f"Unsupported format '{fmt}'")
+        if template not in TEMPLATES:
+            raise ValueError(f"Unknown template '{template}'")
+
+        key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), fmt, template)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        data = RENDERERS[fmt](text, template)
+
+        with self._lock:
+            if key not in self._entries and len(data) <= self.max_bytes:
+                self._entries[key] = data
+                self.size += len(data)
+                while self.size > self.max_bytes:
+                    _, old = self._entries.popitem(last=False)
+                    self.size -= len(old)
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+render_cache = RenderCache()
+
+
+def render_zip(artifacts: dict, formats, template: str = "default") -> bytes:
+    """Render every artifact in every format into one in-memory zip."""
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, text in artifacts.items():
+            for fmt in formats:
+                safe_name = re.sub(r"[^\w.-]", "_", name) or "document"
+                zf.writestr(f"{safe_name}.{fmt}", render_cache.render(text, fmt, template))
+    return buf.getvalue()
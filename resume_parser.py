@@ -0,0 +1,150 @@
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from docx import Document
+from pypdf import PdfReader
+from pypdf.errors import PdfReadError
+
+PARSE_MAX_BYTES = int(os.getenv("PARSE_MAX_BYTES", str(10 * 1024 * 1024)))
+PARSE_MAX_PAGES = int(os.getenv("PARSE_MAX_PAGES", "40"))
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "256"))
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Smaller PDFs are cheaper to extract in-process than to ship to workers.
+PARALLEL_PAGE_THRESHOLD = 8
+
+KNOWN_HEADINGS = {
+    "summary", "professional summary", "profile", "objective", "about me",
+    "skills", "technical skills", "core competencies", "experience",
+    "work experience", "professional experience", "employment history",
+    "projects", "education", "certifications", "achievements", "awards",
+    "publications", "languages", "interests", "volunteering", "internships",
+}
+BULLET_RE = re.compile(r"^\s*[•●▪‣◦○■□\-\*–·]\s*")
+
+
+class ParseError(ValueError):
+    def __init__(self, message: str, status_code: int = 422):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def init_parse_pool():
+    """Create the PDF worker pool; called once at startup."""
+    return _get_pool()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # The backend runs threads and holds SQLite connections, so workers
+            # are spawned fresh rather than forked with copies of held locks.
+            _pool = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _extract_pages(data: bytes, start: int, stop: int) -> list:
+    reader = PdfReader(BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def extract_pdf_text(data: bytes):
+    try:
+        reader = PdfReader(BytesIO(data))
+        n_pages = len(reader.pages)
+    except (PdfReadError, ValueError) as e:
+        raise ParseError(f"Unreadable PDF: {e}")
+
+    if n_pages > PARSE_MAX_PAGES:
+        raise ParseError(f"PDF has {n_pages} pages (max {PARSE_MAX_PAGES})", status_code=413)
+
+    if n_pages < PARALLEL_PAGE_THRESHOLD or PARSE_WORKERS < 2:
+        pages = [page.extract_text() or "" for page in reader.pages]
+    else:
+        step = -(-n_pages // PARSE_WORKERS)
+        ranges = [(i, min(i + step, n_pages)) for i in range(0, n_pages, step)]
+        futures = [_get_pool().submit(_extract_pages, data, a, b) for a, b in ranges]
+        pages = [text for f in futures for text in f.result()]
+
+    return "\n".join(pages).strip(), n_pages
+
+
+def extract_docx_text(data: bytes):
+    try:
+        doc = Document(BytesIO(data))
+    except Exception as e:
+        raise ParseError(f"Unreadable DOCX: {e}")
+    return "\n".join(p.text for p in doc.paragraphs).strip(), None
+
+
+def _is_heading(line: str) -> bool:
+    if len(line) > 60 or line.endswith((".", ",")):
+        return False
+    bare = line.rstrip(":").strip()
+    if bare.lower() in KNOWN_HEADINGS:
+        return True
+    letters = [c for c in bare if c.isalpha()]
+    return len(letters) >= 3 and all(c.isupper() for c in letters) and len(bare.split()) <= 4
+
+
+def split_sections(text: str) -> list:
+    sections = [{"heading": None, "lines": [], "bullets": []}]
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if _is_heading(line):
+            sections.append({"heading": line.rstrip(":").strip(), "lines": [], "bullets": []})
+        elif BULLET_RE.match(line):
+            sections[-1]["bullets"].append(BULLET_RE.sub("", line, count=1))
+        else:
+            sections[-1]["lines"].append(line)
+
+    return [s for s in sections if s["heading"] or s["lines"] or s["bullets"]]
+
+
+def parse_resume(data: bytes, filename: str) -> dict:
+    """Extract text and sections from an uploaded PDF/DOCX, cached by content hash."""
+    if len(data) > PARSE_MAX_BYTES:
+        raise ParseError(f"File too large (max {PARSE_MAX_BYTES} bytes)", status_code=413)
+
+    name = (filename or "").lower()
+    if not name.endswith((".pdf", ".docx")):
+        raise ParseError("Only PDF and DOCX files are supported", status_code=415)
+
+    digest = hashlib.sha256(data).hexdigest()
+    with _cache_lock:
+        if digest in _cache:
+            _cache.move_to_end(digest)
+            return {**_cache[digest], "cached": True}
+
+    if name.endswith(".pdf"):
+        text, pages = extract_pdf_text(data)
+    else:
+        text, pages = extract_docx_text(data)
+
+    result = {
+        "sha256": digest,
+        "pages": pages,
+        "text": text,
+        "sections": split_sections(text),
+    }
+    with _cache_lock:
+        _cache[digest] = result
+        while len(_cache) > PARSE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return {**result, "cached": False}
@@ -1,8 +1,135 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import atexit
+import hashlib
+import os
+import threading
+import time
 
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from db import DATA_DIR
+from metrics import timed
+
+IDF_MODEL_PATH = os.path.join(DATA_DIR, "idf_model.npz")
+IDF_SAVE_INTERVAL = 60  # seconds between background saves of a changed model
+
+
+class CorpusIdfModel:
+    """Document frequencies over the stored job/resume corpus.
+
+    Terms are hashed into a fixed feature space, so new documents can be
+    added without refitting and scoring is only transform + dot product.
+    """
+
+    def __init__(self, path=IDF_MODEL_PATH, n_features=2 ** 18):
+        self.path = path
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, stop_words="english",
+            alternate_sign=False, norm=None
+        )
+        self.df = np.zeros(n_features, dtype=np.int32)
+        self.n_docs = 0
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.time()
+        self._update_idf()
+
+    def _update_idf(self):
+        # Same smoothing as sklearn's TfidfVectorizer.
+        self.idf = np.log((1 + self.n_docs) / (1 + self.df)) + 1.0
+
+    @staticmethod
+    def _doc_hash(text: str) -> int:
+        return int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+
+    @timed("idf.partial_fit")
+    def partial_fit(self, docs) -> int:
+        """Add unseen documents to the corpus; returns how many were added."""
+        with self._lock:
+            new = []
+            for d in docs:
+                if not d or not d.strip():
+                    continue
+                h = self._doc_hash(d)
+                if h not in self._seen:
+                    self._seen.add(h)
+                    new.append(d)
+            if not new:
+                return 0
+
+            counts = self.vectorizer.transform(new)
+            counts.data[:] = 1
+            self.df += np.asarray(counts.sum(axis=0), dtype=np.int32).ravel()
+            self.n_docs += len(new)
+            self._update_idf()
+            self._dirty = True
+        return len(new)
+
+    def transform(self, docs):
+        tf = self.vectorizer.transform(docs)
+        return normalize(tf.multiply(self.idf).tocsr())
+
+    def save(self):
+        with self._lock:
+            tmp = self.path + ".tmp.npz"
+            np.savez_compressed(
+                tmp, df=self.df, n_docs=np.int64(self.n_docs),
+                seen=np.fromiter(self._seen, dtype=np.uint64, count=len(self._seen))
+            )
+            os.replace(tmp, self.path)
+            self._dirty = False
+            self._last_save = time.time()
+
+    def maybe_save(self):
+        if self._dirty and time.time() - self._last_save >= IDF_SAVE_INTERVAL:
+            self.save()
+
+    def flush(self):
+        if self._dirty:
+            self.save()
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        data = np.load(self.path)
+        if data["df"].shape != self.df.shape:
+            return False
+        with self._lock:
+            self.df = data["df"].astype(np.int32)
+            self.n_docs = int(data["n_docs"])
+            self._seen = set(int(h) for h in data["seen"])
+            self._update_idf()
+        return True
+
+
+idf_model = CorpusIdfModel()
+
+
+def init_idf_model(load_corpus=None):
+    """Load the saved model, or fit it from load_corpus() on first run."""
+    if not idf_model.load() and load_corpus is not None:
+        idf_model.partial_fit(load_corpus())
+        idf_model.save()
+    atexit.register(idf_model.flush)
+
+
+@timed("score.job_match")
 def job_match_score(resume_text, job_text):
-    vectorizer = TfidfVectorizer(stop_words="english")
-    tfidf = vectorizer.fit_transform([resume_text, job_text])
-    score = cosine_similarity(tfidf[0:1], tfidf[1:2])[0][0]
-    return round(score * 100, 2)
+    tfidf = idf_model.transform([resume_text, job_text])
+    score = tfidf[0].multiply(tfidf[1]).sum()
+    return round(float(score) * 100, 2)
+
+@timed("score.batch")
+def batch_job_match_scores(resume_text, job_texts):
+    """Score one resume against many job descriptions in a single pass.
+
+    Rows of the TF-IDF matrix are L2-normalised, so one sparse product of
+    the job rows with the resume row gives every cosine similarity.
+    """
+    if not job_texts:
+        return []
+    tfidf = idf_model.transform([resume_text, *job_texts])
+    sims = (tfidf[1:] @ tfidf[0].T).toarray().ravel()
+    return [round(float(s) * 100, 2) for s in sims]
@@ -0,0 +1,238 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from compaction import estimate_tokens, strip_boilerplate
+from db import DATA_DIR
+from metrics import Counter, timed
+from model_residency import residency
+from ollama_client import OllamaError, ollama
+
+EMBED_MODEL = os.getenv("EMBED_MODEL", "nomic-embed-text")
+EMBEDDINGS_PATH = os.path.join(DATA_DIR, "embeddings.db")
+# Texts are embedded in chunks of about this many tokens; a JD chunk is
+# scored by its closest resume chunk.
+CHUNK_TOKENS = int(os.getenv("EMBED_CHUNK_TOKENS", "200"))
+MAX_CHUNKS = int(os.getenv("EMBED_MAX_CHUNKS", "32"))
+EMBED_BATCH = int(os.getenv("EMBED_BATCH", "32"))
+EMBED_MEMORY_CACHE = int(os.getenv("EMBED_MEMORY_CACHE", "4096"))
+
+EMBED_LOOKUPS = Counter("embedding_cache_lookups_total", "Chunk embedding lookups", labels=("result",))
+
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS) -> list:
+    """Split text into line-aligned chunks of at most about max_tokens."""
+    pieces = []
+    for line in text.splitlines():
+        words = line.split()
+        while words:
+            # Overlong lines are split on word boundaries.
+            take, used = 0, 0
+            while take < len(words) and (take == 0 or used + estimate_tokens(words[take]) + 1 <= max_tokens):
+                used += estimate_tokens(words[take]) + 1
+                take += 1
+            pieces.append(" ".join(words[:take]))
+            words = words[take:]
+
+    chunks, current, used = [], [], 0
+    for piece in pieces:
+        cost = estimate_tokens(piece) + 1
+        if current and used + cost > max_tokens:
+            chunks.append(" ".join(current))
+            current, used = [], 0
+        current.append(piece)
+        used += cost
+    if current:
+        chunks.append(" ".join(current))
+    return chunks[:MAX_CHUNKS]
+
+
+class EmbeddingStore:
+    """float32 vectors keyed by sha256(model + text), in SQLite with an in-memory LRU in front."""
+
+    def __init__(self, path=EMBEDDINGS_PATH, memory_size=EMBED_MEMORY_CACHE):
+        self.path = path
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        conn = self._conn()
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS embeddings (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            dim INTEGER NOT NULL,
+            vector BLOB NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """)
+        conn.close()
+
+    def _conn(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key, vec):
+        with self._lock:
+            self._memory[key] = vec
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def get_many(self, keys) -> dict:
+        found, missing = {}, []
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                else:
+                    missing.append(key)
+
+        if missing:
+            conn = self._conn()
+            try:
+                for i in range(0, len(missing), 500):
+                    part = missing[i:i + 500]
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})",
+                        part
+                    ).fetchall()
+                    for key, blob in rows:
+                        vec = np.frombuffer(blob, dtype=np.float32)
+                        found[key] = vec
+                        self._remember(key, vec)
+            finally:
+                conn.close()
+        return found
+
+    def put_many(self, model: str, items: dict):
+        now = time.time()
+        conn = self._conn()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(key, model, len(vec), vec.tobytes(), now) for key, vec in items.items()]
+            )
+        finally:
+            conn.close()
+        for key, vec in items.items():
+            self._remember(key, vec)
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        try:
+            count, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()
+        finally:
+            conn.close()
+        with self._lock:
+            in_memory = len(self._memory)
+        return {"vectors": count, "vector_bytes": size, "in_memory": in_memory, "model": EMBED_MODEL}
+
+
+embedding_store = EmbeddingStore()
+_legacy_api = False
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _no_such_endpoint(e: OllamaError) -> bool:
+    # Ollama's router answers unknown paths with a plain-text 404; a missing
+    # model is a 404 too, but with a JSON {"error": ...} body.
+    return e.status_code == 404 and not str(e).lstrip().startswith("{")
+
+
+@timed("semantic.embed_upstream")
+def _embed_upstream(texts, model):
+    """Embeddings for texts, via /api/embed batches or one /api/embeddings call per text."""
+    global _legacy_api
+    keep_alive = residency.keep_alive(model)
+    if not _legacy_api:
+        try:
+            data = ollama.post_json("/api/embed", {"model": model, "input": texts, "keep_alive": keep_alive})
+        except OllamaError as e:
+            if not _no_such_endpoint(e):
+                raise
+            # Ollama before 0.3 only has the single-text endpoint.
+            _legacy_api = True
+        else:
+            if "embeddings" not in data:
+                raise OllamaError(f"Unexpected /api/embed reply: {str(data)[:200]}")
+            return data["embeddings"]
+    return [
+        ollama.post_json("/api/embeddings", {"model": model, "prompt": t, "keep_alive": keep_alive})["embedding"]
+        for t in texts
+    ]
+
+
+@timed("semantic.embed")
+def embed_texts(texts, model: str = EMBED_MODEL) -> np.ndarray:
+    """L2-normalised float32 rows for texts, fetching only the uncached ones."""
+    keys = [EmbeddingStore.make_key(model, t) for t in texts]
+    cached = embedding_store.get_many(set(keys))
+    EMBED_LOOKUPS.inc(sum(1 for k in keys if k in cached), result="hit")
+
+    todo = {}
+    for key, text in zip(keys, texts):
+        if key not in cached:
+            todo[key] = text
+    EMBED_LOOKUPS.inc(len(todo), result="miss")
+
+    pending = list(todo.items())
+    for i in range(0, len(pending), EMBED_BATCH):
+        batch = pending[i:i + EMBED_BATCH]
+        vectors = _embed_upstream([text for _, text in batch], model)
+        fresh = {key: np.asarray(vec, dtype=np.float32) for (key, _), vec in zip(batch, vectors)}
+        embedding_store.put_many(model, fresh)
+        cached.update(fresh)
+
+    if not keys:
+        return np.zeros((0, 0), dtype=np.float32)
+    return _normalize_rows(np.vstack([cached[k] for k in keys]))
+
+
+@timed("score.semantic_batch")
+def batch_semantic_scores(resume_text, job_texts, model: str = EMBED_MODEL):
+    """Semantic match of one resume against many JDs, 0-100 like job_match_score.
+
+    Each JD chunk is matched to its most similar resume chunk; a job's score
+    is the mean over its chunks. All jobs are scored with one matrix product.
+    """
+    if not job_texts:
+        return []
+    resume_chunks = chunk_text(resume_text)
+    job_chunks = [chunk_text(strip_boilerplate(job)[0]) for job in job_texts]
+    if not resume_chunks:
+        return [0.0] * len(job_texts)
+
+    flat = [c for chunks in job_chunks for c in chunks]
+    vectors = embed_texts(resume_chunks + flat, model)
+    resume_vecs, job_vecs = vectors[:len(resume_chunks)], vectors[len(resume_chunks):]
+
+    best = (job_vecs @ resume_vecs.T).max(axis=1) if len(flat) else np.zeros(0, dtype=np.float32)
+    scores, start = [], 0
+    for chunks in job_chunks:
+        n = len(chunks)
+        # Unrelated texts can have negative cosine; clamp to job_match_score's range.
+        scores.append(round(max(0.0, float(best[start:start + n].mean())) * 100, 2) if n else 0.0)
+        start += n
+    return scores
+
+
+def semantic_score(resume_text, job_text, model: str = EMBED_MODEL) -> float:
+    return batch_semantic_scores(resume_text, [job_text], model)[0]
@@ -0,0 +1,167 @@
+import json
+import os
+import re
+import threading
+from collections import Counter, deque
+
+from metrics import timed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", os.path.join(BASE_DIR, "skill_taxonomy.json"))
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text finds every pattern occurrence."""
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for pattern, value in patterns:
+            self._add(pattern, value)
+        self._build()
+
+    def _add(self, pattern, value):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), value))
+
+    def _build(self):
+        todo = deque(self._goto[0].values())
+        while todo:
+            state = todo.popleft()
+            for ch, nxt in self._goto[state].items():
+                todo.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        """Yield (start, end, value) for every occurrence, overlapping ones included."""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, value in self._out[state]:
+                yield i - length + 1, i + 1, value
+
+
+def _squash(text: str) -> str:
+    return re.sub(r"\s+", " ", text)
+
+
+def _lower(text: str) -> str:
+    low = text.lower()
+    if len(low) == len(text):
+        return low
+    # Keep offsets aligned with the original for the rare chars that expand.
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def _on_boundary(text, start, end, joiners="") -> bool:
+    # Only alphanumeric pattern edges need a word boundary, so "c++" and ".net" still match.
+    word = lambda c: c.isalnum() or c in joiners
+    if text[start].isalnum() and start > 0 and word(text[start - 1]):
+        return False
+    if text[end - 1].isalnum() and end < len(text) and word(text[end]):
+        return False
+    return True
+
+
+class SkillExtractor:
+    def __init__(self, taxonomy: dict):
+        self.skills = {s["name"]: s for s in taxonomy["skills"]}
+        folded, exact = [], []
+        for s in taxonomy["skills"]:
+            names = list(s.get("aliases", []))
+            if "case_sensitive" in s:
+                exact += [(_squash(n), s["name"]) for n in s["case_sensitive"]]
+            else:
+                names.append(s["name"])
+            folded += [(_squash(n.lower()), s["name"]) for n in names]
+        self._folded = AhoCorasick(folded)
+        self._exact = AhoCorasick(exact)
+
+    def extract(self, text: str) -> Counter:
+        """Skill name -> number of mentions in text."""
+        text = _squash(text or "")
+        low = _lower(text)
+        spans = [m for m in self._folded.iter_matches(low) if _on_boundary(low, m[0], m[1])]
+        # Case-sensitive names are short and ambiguous ("Go"), so "Go-to" is not a match.
+        spans += [m for m in self._exact.iter_matches(text) if _on_boundary(text, m[0], m[1], "-")]
+
+        # Longest match wins, so "react native" is not also counted as "react".
+        spans.sort(key=lambda m: (m[0], m[0] - m[1]))
+        found, last_end = Counter(), 0
+        for start, end, name in spans:
+            if start >= last_end:
+                found[name] += 1
+                last_end = end
+        return found
+
+    def describe(self, counts: Counter) -> list:
+        return [
+            {"name": name, "category": self.skills[name]["category"], "mentions": n}
+            for name, n in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        ]
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor() -> SkillExtractor:
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            with open(SKILL_TAXONOMY_PATH, encoding="utf-8") as f:
+                _extractor = SkillExtractor(json.load(f))
+        return _extractor
+
+
+@timed("skills.extract")
+def extract_skills(text: str) -> list:
+    extractor = get_extractor()
+    return extractor.describe(extractor.extract(text))
+
+
+@timed("skills.compare")
+def compare_skills(resume_text: str, job_text: str) -> dict:
+    """Exact skill overlap between a resume and a JD; missing skills are ordered by JD mentions."""
+    extractor = get_extractor()
+    resume = extractor.extract(resume_text)
+    job = extractor.extract(job_text)
+
+    job_skills = extractor.describe(job)
+    matched = [s["name"] for s in job_skills if s["name"] in resume]
+    missing = [s["name"] for s in job_skills if s["name"] not in resume]
+    return {
+        "job_skills": job_skills,
+        "resume_skills": extractor.describe(resume),
+        "matched": matched,
+        "missing": missing,
+        "extra": sorted(set(resume) - set(job)),
+        "coverage": round(len(matched) / len(job_skills) * 100, 2) if job_skills else None,
+    }
+
+
+def format_missing_skills(result: dict) -> str:
+    """Plain-text version of compare_skills() for the missing_skills artifact."""
+    lines = ["1) Missing Skills"]
+    lines += [f"- {name}" for name in result["missing"]] or ["- None, the resume covers every skill the job lists"]
+    lines += ["", "2) Skills You Already Match"]
+    lines += [f"- {name}" for name in result["matched"]] or ["- None detected"]
+    if result["coverage"] is not None:
+        lines += ["", f"Skill coverage: {result['coverage']}%"]
+    return "\n".join(lines)